@@ -20,6 +20,11 @@ class MaskMode(Enum):
     SAM_AUTO = "sam_auto"    # SAM automatic
     THRESHOLD = "threshold"   # Threshold-based
 
+class SaveState(Enum):
+    """Whether the current mask matches what is on disk."""
+    SAVED = "saved"
+    DIRTY = "dirty"  # Modified since the last save or load
+
 class IMaskGenerator(ABC):
     """Interface for mask generation strategies."""
     
@@ -12,12 +12,18 @@ and easier to test.
 
 Classes:
     EventType: Enumeration of all available event types
-    Event: Data structure for event information
+    Event: Immutable data structure for event information
     EventBus: Central event dispatcher and subscription manager
 """
+import functools
+import inspect
+import weakref
+from collections import deque
+from contextlib import contextmanager
 from typing import Any, Callable
 from enum import Enum, auto
 from dataclasses import dataclass
+from PySide6.QtCore import QTimer
 from utils.logging_config import get_logger
 
 
@@ -49,13 +55,36 @@ class EventType(Enum):
     # UI events
     STATUS_UPDATE = auto()
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Event:
     """Base event class containing event data."""
     event_type: EventType
     data: Any = None
     source: str = None
 
+@functools.lru_cache(maxsize=None)
+def shared_event(event_type: EventType, source: str = None) -> Event:
+    """
+    Get a reusable instance of an event that carries no data.
+    
+    Events are immutable, so frequently fired data-less events can share
+    a single instance per (event_type, source) instead of allocating one
+    per publish.
+    """
+    return Event(event_type=event_type, source=source)
+
+def _callback_ref(callback: Callable[[Event], None]) -> Callable[[], Callable[[Event], None]]:
+    """
+    Create a reference to a subscriber callback.
+    
+    Bound methods are held weakly so the bus never keeps a widget or service
+    alive; plain functions and lambdas are held strongly, as they usually
+    have no other owner.
+    """
+    if inspect.ismethod(callback):
+        return weakref.WeakMethod(callback)
+    return lambda: callback
+
 class EventBus:
     """
     Central event bus for application-wide communication.
@@ -67,37 +96,113 @@ class EventBus:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance._subscribers = {}
+            # EventType values are dense auto() integers, so subscribers live in a
+            # list indexed by value rather than a dict keyed by the enum member
+            cls._instance._subscribers = [()] * (max(e.value for e in EventType) + 1)
+            cls._instance._queue = deque()  # EventTypes awaiting asynchronous dispatch, in order
+            cls._instance._queued = {}  # EventType -> latest Event queued for async dispatch
+            cls._instance._pumping = False
+            cls._instance._batch_depth = 0
+            cls._instance._batched = {}  # EventType -> latest Event published while batching
             cls._instance.logger = get_logger(__name__)
         return cls._instance
     
     def subscribe(self, event_type: EventType, callback: Callable[[Event], None]) -> None:
         """Subscribe to an event type with a callback function."""
-        if event_type not in self._subscribers:
-            self._subscribers[event_type] = []
-        self._subscribers[event_type].append(callback)
+        # Subscriber lists are immutable tuples, rebuilt on change (copy-on-write),
+        # so publish can iterate a snapshot without copying.
+        self._subscribers[event_type.value] += (_callback_ref(callback),)
     
     def unsubscribe(self, event_type: EventType, callback: Callable[[Event], None]) -> None:
         """Unsubscribe from an event type."""
-        if event_type in self._subscribers:
-            try:
-                self._subscribers[event_type].remove(callback)
-            except ValueError:
-                pass  # Callback not found
+        subscribers = self._subscribers[event_type.value]
+        # Drop only the first match, mirroring list.remove semantics
+        for index, ref in enumerate(subscribers):
+            if ref() == callback:
+                self._subscribers[event_type.value] = subscribers[:index] + subscribers[index + 1:]
+                break
     
     def publish(self, event: Event) -> None:
         """Publish an event to all subscribers."""
-        if event.event_type in self._subscribers:
-            for callback in self._subscribers[event.event_type]:
-                try:
-                    callback(event)
-                except Exception as e:
-                    # Log error but continue processing other callbacks
-                    self.logger.error(f"Error in event callback for {event.event_type}: {e}", exc_info=True)
+        if self._batch_depth:
+            # Later events replace earlier ones of the same type until the batch ends
+            self._batched[event.event_type] = event
+            return
+        subscribers = self._subscribers[event.event_type.value]
+        if not subscribers:
+            return
+        has_dead_refs = False
+        for ref in subscribers:
+            callback = ref()
+            if callback is None:
+                # Subscriber was garbage collected without unsubscribing
+                has_dead_refs = True
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                # Log error but continue processing other callbacks
+                self.logger.error(f"Error in event callback for {event.event_type}: {e}", exc_info=True)
+        if has_dead_refs:
+            self._prune(event.event_type)
+    
+    def _prune(self, event_type: EventType) -> None:
+        """Drop subscribers whose owners have been garbage collected."""
+        self._subscribers[event_type.value] = tuple(
+            ref for ref in self._subscribers[event_type.value] if ref() is not None
+        )
+    
+    def publish_async(self, event: Event) -> None:
+        """
+        Queue an event for dispatch on the next Qt event loop iteration.
+        
+        An event whose type is already queued replaces the queued one,
+        keeping its place, so repeated publishes within one tick are
+        dispatched once with the latest data.
+        """
+        event_type = event.event_type
+        is_queued = event_type in self._queued
+        self._queued[event_type] = event
+        if is_queued:
+            return
+        self._queue.append(event_type)
+        # A pump is already scheduled or running whenever the queue was non-empty
+        if len(self._queue) == 1 and not self._pumping:
+            QTimer.singleShot(0, self._pump)
+    
+    def _pump(self) -> None:
+        """Drain the async queue, including events queued by callbacks."""
+        self._pumping = True
+        try:
+            while self._queue:
+                self.publish(self._queued.pop(self._queue.popleft()))
+        finally:
+            self._pumping = False
+    
+    @contextmanager
+    def batch(self):
+        """
+        Buffer publishes for the duration of a with-block.
+        
+        Events are coalesced by type, keeping the latest of each, and
+        dispatched once when the outermost batch exits.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                pending, self._batched = self._batched, {}
+                for event in pending.values():
+                    self.publish(event)
     
     def clear_all(self) -> None:
         """Clear all subscribers (useful for testing)."""
-        self._subscribers.clear()
+        self._subscribers[:] = [()] * len(self._subscribers)
+        self._queue.clear()
+        self._queued.clear()
+        self._batched.clear()
 
 # Global event bus instance
 event_bus = EventBus()
\ No newline at end of file
@@ -16,6 +16,25 @@ from ui.main_window import MainWindow
 from ui.stylesheet import get_base_stylesheet
 from utils.logging_config import setup_logging, get_logger
 
+# Successfully loaded icons by path; failures are not cached, so a missing
+# icon is looked for again next time
+_icon_cache = {}
+
+def _load_icon(icon_path):
+    """
+    Load an icon from disk, decoding it only once per path.
+    
+    Returns:
+        QIcon or None: The icon if it loaded, None otherwise.
+    """
+    icon = _icon_cache.get(icon_path)
+    if icon is None and os.path.isfile(icon_path):
+        icon = QIcon(icon_path)
+        if icon.isNull():
+            return None
+        _icon_cache[icon_path] = icon
+    return icon
+
 def setup_application_icon():
     """
     Setup application icon.
@@ -23,13 +42,7 @@ def setup_application_icon():
     Returns:
         QIcon or None: The application icon if found, None otherwise.
     """
-    icon_path = os.path.join("Assets", "thumb.png")
-    if os.path.isfile(icon_path):
-        icon = QIcon(icon_path)
-        if not icon.isNull():
-            return icon
-    
-    return None
+    return _load_icon(os.path.join("Assets", "thumb.png"))
 
 def main():
     """Initialize and run the application."""
@@ -2,17 +2,52 @@
 Data models for experiments and project configuration.
 """
 
+import os
 from dataclasses import dataclass
-from typing import List
+from functools import cached_property
+from typing import List, Optional
 from pathlib import Path
 
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.bmp'})
+
+def _folder_has_entries(folder: Path) -> bool:
+    """Check whether a directory exists and contains at least one entry."""
+    try:
+        with os.scandir(folder) as it:
+            return next(it, None) is not None
+    except OSError:
+        return False
+
+
 @dataclass
 class ExperimentFolder:
-    """Represents a single experiment folder (e.g., a date folder)."""
+    """
+    Represents a single experiment folder (e.g., a date folder).
+    
+    Image counts and label status are computed lazily on first access, so
+    folders the user never looks at are never scanned.
+    """
     name: str
     path: Path
-    image_count: int
-    has_labels: bool = False
+    label_path: Optional[Path] = None
+    
+    @cached_property
+    def image_count(self) -> int:
+        """Number of images in this folder."""
+        count = 0
+        try:
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    if os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS and entry.is_file():
+                        count += 1
+        except OSError:
+            return 0
+        return count
+    
+    @cached_property
+    def has_labels(self) -> bool:
+        """Whether the mirrored labels folder exists and is non-empty."""
+        return self.label_path is not None and _folder_has_entries(self.label_path)
 
 
 @dataclass
@@ -23,12 +58,12 @@ class Experiment:
     path: Path
     folders: List[ExperimentFolder]
     
-    @property
+    @cached_property
     def total_images(self) -> int:
         """Total number of images across all folders."""
         return sum(folder.image_count for folder in self.folders)
     
-    @property
+    @cached_property
     def labeled_count(self) -> int:
         """Number of folders with labels."""
         return sum(1 for folder in self.folders if folder.has_labels)
@@ -53,10 +88,15 @@ class ProjectConfig:
         experiments = []
         
         if data_path.exists():
-            for exp_dir in data_path.iterdir():
-                if exp_dir.is_dir() and exp_dir.name.startswith("Experiment"):
-                    experiment = cls._create_experiment_from_folder(exp_dir, labels_path)
-                    experiments.append(experiment)
+            # scandir entries cache their type, so is_dir() costs no extra stat()
+            with os.scandir(data_path) as it:
+                exp_dirs = [Path(entry.path) for entry in it
+                            if entry.name.startswith("Experiment") and entry.is_dir()]
+            
+            # Each experiment is one scandir of folder names (counts are lazy),
+            # too little work to be worth spreading over threads
+            experiments = [cls._create_experiment_from_folder(exp_dir, labels_path)
+                           for exp_dir in exp_dirs]
         
         return cls(
             data_path=data_path,
@@ -71,23 +111,16 @@ class ProjectConfig:
         exp_id = exp_dir.name.lower().replace(" ", "_")
         folders = []
         
-        for folder in exp_dir.iterdir():
-            if folder.is_dir():
-                # Count images in this folder
-                image_files = [f for f in folder.iterdir() 
-                             if f.suffix.lower() in ['.png', '.jpg', '.jpeg', '.bmp']]
-                
-                # Check if labels exist for this folder
-                label_folder = labels_path / exp_dir.name / folder.name
-                has_labels = label_folder.exists() and any(label_folder.iterdir())
-                
-                exp_folder = ExperimentFolder(
-                    name=folder.name,
-                    path=folder,
-                    image_count=len(image_files),
-                    has_labels=has_labels
-                )
-                folders.append(exp_folder)
+        with os.scandir(exp_dir) as it:
+            folder_entries = [entry for entry in it if entry.is_dir()]
+        
+        for folder in folder_entries:
+            exp_folder = ExperimentFolder(
+                name=folder.name,
+                path=Path(folder.path),
+                label_path=labels_path / exp_dir.name / folder.name
+            )
+            folders.append(exp_folder)
         
         return Experiment(
             id=exp_id,
@@ -95,3 +128,4 @@ class ProjectConfig:
             path=exp_dir,
             folders=sorted(folders, key=lambda x: x.name)
         )
+
@@ -2,27 +2,84 @@
 Auto SAM service for automatic mask generation using the largest region detection.
 """
 
+import os
+import functools
+import threading
 import cv2
-from skimage.measure import regionprops, label
-from PySide6.QtCore import QObject, Signal
-from PySide6.QtCore import QPoint
+import numpy as np
+from PySide6.QtCore import QObject, QPoint, QRunnable, QThreadPool, Signal
 from utils.logging_config import get_logger
 
 
+class _AutoMaskTask(QRunnable):
+    """Thread pool task that runs the auto SAM region analysis for one image."""
+    
+    def __init__(self, service, image_path):
+        super().__init__()
+        self.service = service
+        self.image_path = image_path
+    
+    def run(self):
+        self.service._compute_and_emit(self.image_path)
+
+
 class AutoSamService(QObject):
     """Service for automatic SAM mask generation."""
     
     # Signals
-    auto_mask_generated = Signal(object)  # QPoint for the centroid
+    auto_mask_generated = Signal(str, QPoint)  # Image path, centroid of the largest region
     
-    def __init__(self, model_service):
+    def __init__(self, model_service, downsample_factor=2):
+        """
+        Initialize the auto SAM service.
+        
+        Args:
+            model_service: SAM model service used for predictions.
+            downsample_factor (int): Factor by which images are shrunk before
+                region analysis; the centroid does not need full resolution.
+        """
         super().__init__()
         self.model_service = model_service
+        self.downsample_factor = max(1, int(downsample_factor))
         self.logger = get_logger(__name__)
+        
+        # Centroids keyed by (path, mtime, size); the analysis is deterministic per file
+        self._cached_centroid = functools.lru_cache(maxsize=512)(self._compute_centroid)
+        
+        # Per-thread scratch buffers, reused across calls while the working image
+        # size is unchanged; the worker and any synchronous caller never share them
+        self._scratch = threading.local()
+        
+        # Single worker thread, so queued images are analysed one at a time
+        self._thread_pool = QThreadPool(self)
+        self._thread_pool.setMaxThreadCount(1)
     
     def generate_auto_mask(self, image_path):
         """
-        Generate auto mask using the largest region detection approach.
+        Start auto mask generation using the largest region detection approach.
+        
+        The analysis runs on a worker thread so the UI stays responsive; the
+        result is delivered through the auto_mask_generated signal.
+        
+        Args:
+            image_path: Path to the image to process.
+            
+        Returns:
+            None: The centroid is emitted via auto_mask_generated when ready.
+        """
+        if not image_path:
+            self.logger.warning("No image path provided for auto SAM generation")
+            return None
+        
+        self._thread_pool.start(_AutoMaskTask(self, image_path))
+        return None
+    
+    def find_centroid(self, image_path):
+        """
+        Find the centroid of the largest region in an image synchronously.
+        
+        Results are cached per image path and invalidated when the file's
+        modification time or size changes.
         
         Args:
             image_path: Path to the image to process.
@@ -35,48 +92,82 @@ class AutoSamService(QObject):
             return None
         
         try:
-            self.logger.debug(f"Generating auto mask for image: {image_path}")
-            # Load and process the image
-            image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-            if image is None:
-                self.logger.error(f"Could not load image: {image_path}")
+            stat_result = os.stat(image_path)
+            centroid = self._cached_centroid(image_path, stat_result.st_mtime_ns, stat_result.st_size)
+            if centroid is None:
                 return None
             
-            # Binarise the image using Otsu's thresholding method
-            _, binarised_image = cv2.threshold(image, 0, 255, cv2.THRESH_OTSU)
-            
-            # Invert the image
-            binarised_image = cv2.bitwise_not(binarised_image)
-            
-            # Calculate region properties of the image
-            labeled_mask = label(binarised_image)
-            props = regionprops(labeled_mask)
-            
-            if not props:
-                self.logger.warning(f"No regions found in image: {image_path}")
-                return None
-            
-            # Sort regions by area and select the largest one
-            largest_regions = sorted(props, key=lambda x: x.area, reverse=True)[:5]
-            
-            if largest_regions:
-                largest_region = largest_regions[0]
-                centroid = largest_region.centroid
-
-                # Convert to QPoint format (x, y) - note the order swap
-                centroid_point = QPoint(int(centroid[1]), int(centroid[0]))
-                
-                self.logger.debug(f"Auto SAM found largest region with area {largest_region.area} at centroid ({centroid_point.x()}, {centroid_point.y()})")
-                
-                # Emit signal with the centroid point
-                self.auto_mask_generated.emit(centroid_point)
-                
-                return centroid_point
+            return QPoint(*centroid)
                 
+        except FileNotFoundError:
+            self.logger.error(f"Could not load image: {image_path}")
+            return None
         except Exception as e:
             self.logger.error(f"Error generating auto mask for {image_path}: {e}", exc_info=True)
             return None
     
+    def _compute_and_emit(self, image_path):
+        """Find the centroid for an image and emit it (runs on a worker thread)."""
+        centroid_point = self.find_centroid(image_path)
+        if centroid_point is not None:
+            # Emitting from the worker is delivered to GUI-thread slots as a queued call
+            self.auto_mask_generated.emit(image_path, centroid_point)
+    
+    def _compute_centroid(self, image_path, mtime_ns, size):
+        """
+        Compute the centroid of the largest region in an image.
+        
+        The modification time and size are unused here; they only form part
+        of the cache key so that edited files are recomputed.
+        
+        Returns:
+            tuple: (x, y) centroid in image coordinates, or None if no region.
+        """
+        self.logger.debug(f"Generating auto mask for image: {image_path}")
+        # Load and process the image
+        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            self.logger.error(f"Could not load image: {image_path}")
+            return None
+        
+        # Region analysis is memory-bound, so work on a smaller copy
+        scale = self.downsample_factor
+        if scale > 1:
+            image = cv2.resize(image, None, fx=1 / scale, fy=1 / scale, interpolation=cv2.INTER_AREA)
+        
+        scratch = self._scratch
+        if getattr(scratch, "thresh", None) is None or scratch.thresh.shape != image.shape:
+            scratch.thresh = np.empty_like(image)
+            scratch.labels = np.empty(image.shape, dtype=np.int32)
+        
+        # Binarise and invert the image in one pass using Otsu's thresholding method
+        _, binarised_image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU,
+                                           dst=scratch.thresh)
+        
+        # Label connected regions; stats and centroids come back as arrays
+        num_labels, _, stats, centroids = cv2.connectedComponentsWithStats(
+            binarised_image, labels=scratch.labels, connectivity=8
+        )
+        
+        # Label 0 is the background
+        if num_labels <= 1:
+            self.logger.warning(f"No regions found in image: {image_path}")
+            return None
+        
+        # Select the largest region
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        largest_label = int(np.argmax(areas)) + 1
+        centroid_x, centroid_y = centroids[largest_label]
+        
+        # Convert to (x, y) in full-resolution coordinates
+        centroid = (int(centroid_x * scale), int(centroid_y * scale))
+        
+        # The area is measured on the downsampled image, so scaling it back is approximate
+        approx_area = stats[largest_label, cv2.CC_STAT_AREA] * scale * scale
+        self.logger.debug(f"Auto SAM found largest region with area ~{approx_area} at centroid {centroid}")
+        
+        return centroid
+    
     def apply_auto_sam(self, image_path):
         """
         Apply auto SAM to the given image.
@@ -87,7 +178,7 @@ class AutoSamService(QObject):
         Returns:
             QPoint: The centroid point used for SAM, or None if failed.
         """
-        centroid_point = self.generate_auto_mask(image_path)
+        centroid_point = self.find_centroid(image_path)
         
         if centroid_point:
             # The main window should handle the SAM application using this point
@@ -1,13 +1,18 @@
 """
 Experiment management service with automatic folder detection.
 """
+import os
+import functools
 from pathlib import Path
-from typing import List, Dict, Optional
-from models.experiment import ProjectConfig, Experiment, ExperimentFolder
+from typing import List, Dict, Optional, FrozenSet, Tuple
+from models.experiment import ProjectConfig, Experiment, ExperimentFolder, IMAGE_EXTENSIONS
 from core.events import event_bus, Event, EventType
 from core.base import IExperimentConfig
 from utils.logging_config import get_logger
 
+# Tuple form lets str.endswith test every extension in one call
+IMAGE_SUFFIXES = tuple(sorted(IMAGE_EXTENSIONS))
+
 
 class ExperimentService(IExperimentConfig):
     """
@@ -19,10 +24,23 @@ class ExperimentService(IExperimentConfig):
         self.config: Optional[ProjectConfig] = None
         self.current_experiment: Optional[Experiment] = None
         self.logger = get_logger(__name__)
+        
+        # Per-folder cache of existing mask filenames (one listdir per label folder)
+        self._mask_names_in = functools.lru_cache(maxsize=256)(self._list_mask_names)
+        # Per-experiment set of "folder/filename" mask paths, keyed by experiment id
+        self._labeled_relpaths_cache: Dict[str, FrozenSet[str]] = {}
+        # Per-folder image listing, keyed by folder path, with the directory
+        # mtime it was read at so added or removed files invalidate it
+        self._folder_images_cache: Dict[str, Tuple[int, List[str]]] = {}
+        event_bus.subscribe(EventType.MASK_CREATED, self.on_mask_created)
+        
         self.refresh_experiments()
     
     def refresh_experiments(self):
         """Refresh experiment list by scanning directories."""
+        self._mask_names_in.cache_clear()
+        self._labeled_relpaths_cache.clear()
+        self._folder_images_cache.clear()
         try:
             self.config = ProjectConfig.auto_detect(str(self.base_path))
             self.logger.info(f"Detected {len(self.config.experiments)} experiments in {self.base_path}")
@@ -63,7 +81,8 @@ class ExperimentService(IExperimentConfig):
         """Set the current active experiment."""
         self.current_experiment = experiment
         
-        # Publish experiment change event
+        # Publish experiment change event. Synchronous, so subscribers are up to
+        # date before the caller moves on; bursts are throttled by ExperimentManager
         event_bus.publish(Event(
             event_type=EventType.EXPERIMENT_CHANGED,
             data={
@@ -78,22 +97,43 @@ class ExperimentService(IExperimentConfig):
         return self.current_experiment
     
     def get_folder_image_paths(self, experiment: Experiment, folder_name: str) -> List[str]:
-        """Get all image paths in a specific folder."""
+        """
+        Get all image paths in a specific folder.
+        
+        The listing is cached until the folder's mtime changes; the returned
+        list is shared with the cache and must not be modified.
+        """
         folder = next((f for f in experiment.folders if f.name == folder_name), None)
         if not folder:
             return []
         
-        image_extensions = {'.png', '.jpg', '.jpeg', '.bmp'}
-        image_paths = []
+        folder_path = str(folder.path)
+        try:
+            mtime = os.stat(folder_path).st_mtime_ns
+        except OSError:
+            self._folder_images_cache.pop(folder_path, None)
+            return []
+        
+        cached = self._folder_images_cache.get(folder_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
         
-        for file_path in folder.path.iterdir():
-            if file_path.suffix.lower() in image_extensions:
-                image_paths.append(str(file_path))
+        # DirEntry.path is already a string, so no Path objects are built per file
+        with os.scandir(folder_path) as it:
+            image_paths = [entry.path for entry in it
+                           if entry.name.lower().endswith(IMAGE_SUFFIXES) and entry.is_file()]
         
-        return sorted(image_paths)
+        image_paths.sort()
+        self._folder_images_cache[folder_path] = (mtime, image_paths)
+        return image_paths
+    
+    def get_folder_image_count(self, experiment: Experiment, folder_name: str) -> int:
+        """Get the number of images in a specific folder, from the cached listing."""
+        return len(self.get_folder_image_paths(experiment, folder_name))
     
     def get_unlabeled_images(self, experiment: Experiment, folder_names: List[str]) -> List[str]:
         """Get unlabeled images from specified folders."""
+        labeled_relpaths = self._labeled_relpaths(experiment)
         unlabeled_images = []
         
         for folder_name in folder_names:
@@ -101,13 +141,14 @@ class ExperimentService(IExperimentConfig):
             
             for image_path in folder_images:
                 # Check if corresponding mask exists
-                if not self.has_mask(image_path):
+                if f"{folder_name}/{os.path.basename(image_path)}" not in labeled_relpaths:
                     unlabeled_images.append(image_path)
         
         return unlabeled_images
     
     def get_labeled_images(self, experiment: Experiment, folder_names: List[str]) -> List[str]:
         """Get labeled images from specified folders."""
+        labeled_relpaths = self._labeled_relpaths(experiment)
         labeled_images = []
         
         for folder_name in folder_names:
@@ -115,11 +156,47 @@ class ExperimentService(IExperimentConfig):
             
             for image_path in folder_images:
                 # Check if corresponding mask exists
-                if self.has_mask(image_path):
+                if f"{folder_name}/{os.path.basename(image_path)}" in labeled_relpaths:
                     labeled_images.append(image_path)
         
         return labeled_images
     
+    def _labeled_relpaths(self, experiment: Experiment) -> FrozenSet[str]:
+        """Get the "folder/filename" paths of all masks saved for an experiment."""
+        cached = self._labeled_relpaths_cache.get(experiment.id)
+        if cached is not None:
+            return cached
+        
+        relpaths = set()
+        experiment_labels = os.path.join(self.config.labels_path, experiment.name)
+        try:
+            with os.scandir(experiment_labels) as folders:
+                for folder in folders:
+                    if not folder.is_dir():
+                        continue
+                    with os.scandir(folder.path) as masks:
+                        relpaths.update(f"{folder.name}/{mask.name}" for mask in masks)
+        except OSError:
+            # No labels saved for this experiment yet
+            pass
+        
+        labeled_relpaths = frozenset(relpaths)
+        self._labeled_relpaths_cache[experiment.id] = labeled_relpaths
+        return labeled_relpaths
+    
+    def on_mask_created(self, event):
+        """Drop cached mask listings once a mask has been written to disk."""
+        if event.data and "mask_path" in event.data:
+            self._mask_names_in.cache_clear()
+            self._labeled_relpaths_cache.clear()
+    
+    def _list_mask_names(self, label_folder: Path) -> FrozenSet[str]:
+        """List the mask filenames present in a label folder."""
+        try:
+            return frozenset(os.listdir(label_folder))
+        except OSError:
+            return frozenset()
+    
     def has_mask(self, image_path: str) -> bool:
         """Check if an image has a corresponding mask."""
         image_path = Path(image_path)
@@ -127,19 +204,19 @@ class ExperimentService(IExperimentConfig):
         # Calculate relative path from data directory
         try:
             relative_path = image_path.relative_to(self.config.data_path)
-            mask_path = self.config.labels_path / relative_path
-            return mask_path.exists()
         except ValueError:
             # Image path is not relative to data path
             return False
+        
+        label_folder = self.config.labels_path / relative_path.parent
+        return relative_path.name in self._mask_names_in(label_folder)
     
     def get_mask_path(self, image_path: str) -> Optional[str]:
         """Get the mask path for an image."""
         if not self.has_mask(image_path):
             return None
         
-        image_path = Path(image_path)
-        relative_path = image_path.relative_to(self.config.data_path)
+        relative_path = Path(image_path).relative_to(self.config.data_path)
         mask_path = self.config.labels_path / relative_path
         return str(mask_path)
     
@@ -15,15 +15,35 @@ Classes:
     ImageManager: Central service for all image-related operations
 """
 
+import itertools
 import os
 import random
 import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Set
-from models.experiment import Experiment
+from typing import Dict, List, Optional, Set, Tuple
+from models.experiment import Experiment, ExperimentFolder
 from utils.logging_config import get_logger
 from core.events import event_bus, Event, EventType
 
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif'})
+# Lower- and upper-case forms, so the common case is one C-level endswith
+# without building a lowercased copy of every filename
+IMAGE_SUFFIXES = tuple(sorted(IMAGE_EXTENSIONS)) + tuple(sorted(ext.upper() for ext in IMAGE_EXTENSIONS))
+
+def _is_image_name(name: str) -> bool:
+    """Check whether a filename has an image extension (case-insensitive)."""
+    # Mixed-case names like "x.Png" are rare, so only they pay for lower()
+    return name.endswith(IMAGE_SUFFIXES) or name.lower().endswith(IMAGE_SUFFIXES)
+
+def _mtime_ns(path: str) -> int:
+    """Get a directory's modification time, or -1 if it does not exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
 class ImageManager:
     """
     Modern image manager that works with the new experiment service.
@@ -33,14 +53,31 @@ class ImageManager:
     def __init__(self, experiment_service):
         self.experiment_service = experiment_service
         self.current_experiment: Optional[Experiment] = None
-        self.selected_folders: Set[str] = set()
+        self.selected_folders: List[str] = []
+        self._folders_by_name: Dict[str, ExperimentFolder] = {}
         self.viewing_mode = "unlabelled"  # "unlabelled" or "labelled"
         
-        # Image pool and current state
-        self.image_pool: List[str] = []
+        # Image pool and current state. Each selected folder is listed on
+        # first access, so navigating near the start never scans the rest.
+        self._folder_order: List[str] = []
+        self._folder_images: List[Optional[List[str]]] = []
+        self._num_images: Optional[int] = None
         self.current_image_path = ""
         self.current_image_index = 0
         
+        # Mask filenames per labels folder (relative to the labels root),
+        # so has_mask is a set lookup instead of a stat() per image
+        self._mask_index_cache: Dict[str, Set[str]] = {}
+        
+        # (labeled, unlabeled) image lists per data folder (relative to the
+        # data root), so toggling the viewing mode does not rescan anything.
+        # Each entry keeps the data and labels folder mtimes it was built at,
+        # so files added or removed outside the app invalidate it.
+        self._folder_partition_cache: Dict[str, Tuple[Tuple[int, int], List[str], List[str]]] = {}
+        
+        # Project roots, wrapped once rather than on every per-image call
+        self._cache_project_paths()
+        
         # Set up logging
         self.logger = get_logger(__name__)
         
@@ -50,40 +87,85 @@ class ImageManager:
     def on_experiment_changed(self, event):
         """Handle experiment change event."""
         self.current_experiment = event.data["experiment"]
+        self._folders_by_name = {f.name: f for f in self.current_experiment.folders} if self.current_experiment else {}
         self.selected_folders.clear()
+        self._mask_index_cache.clear()
+        self._folder_partition_cache.clear()
+        self._cache_project_paths()
         self.refresh_image_pool()
     
+    def _cache_project_paths(self):
+        """Cache the data, labels and cropped roots as Path objects."""
+        self._data_path = Path(self.experiment_service.data_path)
+        self._labels_path = Path(self.experiment_service.labels_path)
+        self._cropped_path = Path(self.experiment_service.cropped_path)
+        
+        # String prefixes let the per-image helpers slice out the relative
+        # path instead of going through Path.relative_to
+        self._data_prefix = str(self._data_path) + os.sep
+        self._labels_prefix = str(self._labels_path) + os.sep
+        self._cropped_prefix = str(self._cropped_path) + os.sep
+    
     def set_viewing_mode(self, mode: str):
         """Set viewing mode to 'unlabelled' or 'labelled'."""
         self.viewing_mode = mode
+        # Only the slice taken from each cached partition changes
         self.refresh_image_pool()
     
+    def set_viewing_mode_and_folders(self, mode: str, folder_names: List[str]):
+        """Set viewing mode and selected folders together, rebuilding the pool once."""
+        self.viewing_mode = mode
+        self.set_selected_folders(folder_names)
+    
     def set_selected_folders(self, folder_names: List[str]):
         """Set which folders are selected for viewing."""
-        self.selected_folders = set(folder_names)
+        # A list, so the pool and navigation follow the order folders are listed in
+        self.selected_folders = list(dict.fromkeys(folder_names))
+        self._mask_index_cache.clear()
+        self._folder_partition_cache.clear()
         self.refresh_image_pool()
     
     def refresh_image_pool(self):
         """Refresh the image pool based on current settings."""
         if not self.current_experiment or not self.selected_folders:
-            self.image_pool = []
-            self.current_image_path = ""
-            self.current_image_index = 0
-            return
-        
-        # Build image pool
-        self.image_pool = []
+            self._folder_order = []
+        else:
+            self._folder_order = list(self.selected_folders)
         
-        for folder_name in self.selected_folders:
-            folder_images = self.get_folder_images(folder_name)
-            self.image_pool.extend(folder_images)
+        # Folder listings are filled in lazily by _get_pool_folder
+        self._folder_images = [None] * len(self._folder_order)
+        self._num_images = None
         
         # Reset current image
         self.current_image_index = 0
-        if self.image_pool:
-            self.current_image_path = self.image_pool[0]
-        else:
-            self.current_image_path = ""
+        self.current_image_path = self._image_at(0) or ""
+    
+    @property
+    def image_pool(self) -> List[str]:
+        """All images in the pool, listing any folders not yet scanned."""
+        return list(itertools.chain.from_iterable(
+            self._get_pool_folder(position) for position in range(len(self._folder_order))
+        ))
+    
+    def _get_pool_folder(self, position: int) -> List[str]:
+        """Get the images of the pool folder at a position, listing it on first use."""
+        images = self._folder_images[position]
+        if images is None:
+            images = self.get_folder_images(self._folder_order[position])
+            self._folder_images[position] = images
+        return images
+    
+    def _image_at(self, index: int) -> Optional[str]:
+        """Map a pool index to an image path, or None if it is out of range."""
+        if index < 0:
+            return None
+        
+        for position in range(len(self._folder_order)):
+            images = self._get_pool_folder(position)
+            if index < len(images):
+                return images[index]
+            index -= len(images)
+        return None
     
     def get_folder_images(self, folder_name: str) -> List[str]:
         """Get images from a specific folder based on viewing mode."""
@@ -91,99 +173,127 @@ class ImageManager:
             return []
         
         # Find the folder
-        folder = next((f for f in self.current_experiment.folders if f.name == folder_name), None)
+        folder = self._folders_by_name.get(folder_name)
         if not folder:
             return []
         
-        # Get all image files
-        image_extensions = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif'}
-        all_images = []
-        
-        try:
-            for file_path in folder.path.iterdir():
-                if file_path.is_file() and file_path.suffix.lower() in image_extensions:
-                    all_images.append(str(file_path))
-        except Exception as e:
-            self.logger.error(f"Error getting folder images for {folder_name}: {e}", exc_info=True)
-            return []
+        relative_folder = str(folder.path)[len(self._data_prefix):]
+        mtimes = (_mtime_ns(str(folder.path)), _mtime_ns(self._labels_prefix + relative_folder))
+        partition = self._folder_partition_cache.get(relative_folder)
+        if partition is None or partition[0] != mtimes:
+            # The mask listing may be just as stale as the partition built from it
+            self._mask_index_cache.pop(relative_folder, None)
+            try:
+                partition = (mtimes, *self._list_folder_partitioned(folder))
+            except Exception as e:
+                self.logger.error(f"Error getting folder images for {folder_name}: {e}", exc_info=True)
+                return []
+            self._folder_partition_cache[relative_folder] = partition
+        _, labeled, unlabeled = partition
         
         # Filter based on viewing mode
         if self.viewing_mode == "unlabelled":
-            return [img for img in all_images if not self.has_mask(img)]
+            return unlabeled
         elif self.viewing_mode == "labelled":
-            return [img for img in all_images if self.has_mask(img)]
+            return labeled
         else:
-            return all_images
+            return self.get_folder_images_all(folder_name)
+    
+    def _list_folder_partitioned(self, folder) -> Tuple[List[str], List[str]]:
+        """
+        Split a folder's images into (labeled, unlabeled) lists.
+        
+        One scandir of the data folder is matched against one listing of the
+        mirrored labels folder, instead of resolving a mask path per image.
+        """
+        image_names = []
+        
+        # DirEntry caches the file type from readdir, so is_file() needs no stat()
+        with os.scandir(folder.path) as it:
+            for entry in it:
+                name = entry.name
+                if _is_image_name(name) and entry.is_file():
+                    image_names.append(name)
+        # scandir order is filesystem-dependent; sort so navigation is stable
+        image_names.sort()
+        
+        folder_path = str(folder.path)
+        mask_names = self._get_mask_name_set(folder_path[len(self._data_prefix):])
+        
+        labeled = [os.path.join(folder_path, name) for name in image_names if name in mask_names]
+        unlabeled = [os.path.join(folder_path, name) for name in image_names if name not in mask_names]
+        return labeled, unlabeled
     
     def has_mask(self, image_path: str) -> bool:
         """Check if an image has a corresponding mask."""
+        if not image_path.startswith(self._data_prefix):
+            return False
+        
         try:
-            image_path = Path(image_path)
-            data_path = Path(self.experiment_service.data_path)
-            labels_path = Path(self.experiment_service.labels_path)
-            
-            # Calculate relative path from data directory
-            relative_path = image_path.relative_to(data_path)
-            mask_path = labels_path / relative_path
+            # Split the path relative to the data directory into folder and name
+            relative_folder, _, name = image_path[len(self._data_prefix):].rpartition(os.sep)
             
-            return mask_path.exists()
-        except (ValueError, Exception):
+            return name in self._get_mask_name_set(relative_folder)
+        except Exception:
             self.logger.error(f"Error checking mask for {image_path}", exc_info=True)
             return False
     
+    def _get_mask_name_set(self, relative_folder: str) -> Set[str]:
+        """Get the mask filenames in a labels folder, listing it once per refresh."""
+        mask_names = self._mask_index_cache.get(relative_folder)
+        if mask_names is None:
+            try:
+                with os.scandir(self._labels_prefix + relative_folder) as it:
+                    mask_names = {entry.name for entry in it}
+            except FileNotFoundError:
+                mask_names = set()
+            self._mask_index_cache[relative_folder] = mask_names
+        return mask_names
+    
     def get_mask_path(self, image_path: str) -> Optional[str]:
         """Get the mask path for an image."""
         if not self.has_mask(image_path):
             return None
         
-        try:
-            image_path = Path(image_path)
-            data_path = Path(self.experiment_service.data_path)
-            labels_path = Path(self.experiment_service.labels_path)
-            
-            relative_path = image_path.relative_to(data_path)
-            mask_path = labels_path / relative_path
-            
-            return str(mask_path)
-        except (ValueError, Exception):
-            self.logger.error(f"Error getting mask path for {image_path}", exc_info=True)
-            return None
+        # has_mask has already checked that image_path is under the data directory
+        return self._labels_prefix + image_path[len(self._data_prefix):]
     
     def get_random_image(self) -> Optional[str]:
         """Get a random image from the current pool."""
-        # Refresh pool to ensure we have current labelled/unlabelled state
+        # Refresh pool to pick up masks added or removed since it was built
         self.refresh_image_pool()
         
-        if not self.image_pool:
+        num_images = self.get_num_images()
+        if not num_images:
             return None
         
-        self.current_image_index = random.randint(0, len(self.image_pool) - 1)
-        self.current_image_path = self.image_pool[self.current_image_index]
-        return self.current_image_path
+        return self.get_image_by_index(random.randrange(num_images))
     
     def get_image_by_index(self, index: int) -> Optional[str]:
         """Get image by index in the pool."""
-        if not self.image_pool or index < 0 or index >= len(self.image_pool):
+        image_path = self._image_at(index)
+        if image_path is None:
             return None
         
         self.current_image_index = index
-        self.current_image_path = self.image_pool[index]
+        self.current_image_path = image_path
         return self.current_image_path
     
     def get_next_image(self) -> Optional[str]:
         """Get the next image in the pool."""
-        if not self.image_pool:
+        if not self.current_image_path:
             return None
         
-        next_index = (self.current_image_index + 1) % len(self.image_pool)
-        return self.get_image_by_index(next_index)
+        # Wrap to the start without counting the whole pool
+        return self.get_image_by_index(self.current_image_index + 1) or self.get_image_by_index(0)
     
     def get_previous_image(self) -> Optional[str]:
         """Get the previous image in the pool."""
-        if not self.image_pool:
+        num_images = self.get_num_images()
+        if not num_images:
             return None
         
-        prev_index = (self.current_image_index - 1) % len(self.image_pool)
+        prev_index = (self.current_image_index - 1) % num_images
         return self.get_image_by_index(prev_index)
     
     def save_mask(self, mask_qimage) -> bool:
@@ -191,27 +301,43 @@ class ImageManager:
         if not self.current_image_path:
             return False
         
+        if not self.current_image_path.startswith(self._data_prefix):
+            self.logger.error(f"Error saving mask for {self.current_image_path}: not under the data directory")
+            return False
+        
         try:
-            image_path = Path(self.current_image_path)
-            data_path = Path(self.experiment_service.data_path)
-            labels_path = Path(self.experiment_service.labels_path)
-            
             # Calculate relative path and create mask path
-            relative_path = image_path.relative_to(data_path)
-            mask_path = labels_path / relative_path
+            relative_path = self.current_image_path[len(self._data_prefix):]
+            mask_path = self._labels_prefix + relative_path
             
             # Create directories if needed
-            mask_path.parent.mkdir(parents=True, exist_ok=True)
+            os.makedirs(os.path.dirname(mask_path), exist_ok=True)
             
             # Save the mask
-            success = mask_qimage.save(str(mask_path))
+            success = mask_qimage.save(mask_path)
             
             if success:
+                # Keep the cached labels listing in step with the new file
+                relative_folder, _, name = relative_path.rpartition(os.sep)
+                cached_names = self._mask_index_cache.get(relative_folder)
+                if cached_names is not None:
+                    cached_names.add(name)
+                
+                # Move the image into the labeled slice. New lists are built so
+                # the current pool, which may share the old ones, is unaffected.
+                partition = self._folder_partition_cache.get(relative_folder)
+                if partition is not None and self.current_image_path not in partition[1]:
+                    mtimes, labeled, unlabeled = partition
+                    self._folder_partition_cache[relative_folder] = (
+                        mtimes,
+                        labeled + [self.current_image_path],
+                        [image for image in unlabeled if image != self.current_image_path],
+                    )
 
                 # Publish mask saved event
                 event_bus.publish(Event(
                     event_type=EventType.MASK_CREATED,
-                    data={"mask_path": str(mask_path), "image_path": self.current_image_path},
+                    data={"mask_path": mask_path, "image_path": self.current_image_path},
                     source="image_manager"
                 ))
             
@@ -220,25 +346,25 @@ class ImageManager:
             self.logger.error(f"Error saving mask for {self.current_image_path}: {e}", exc_info=True)
             return False
     
-    def save_cropped_image(self, cropped_image_np) -> bool:
-        """Save a cropped image."""
+    def save_cropped_image(self, cropped_image_np, ensure_dir: bool = True) -> bool:
+        """Save a cropped image. Pass ensure_dir=False if the output folder already exists."""
         if not self.current_image_path:
             return False
         
+        if not self.current_image_path.startswith(self._data_prefix):
+            self.logger.error(f"Error saving cropped image for {self.current_image_path}: not under the data directory")
+            return False
+        
         try:
-            image_path = Path(self.current_image_path)
-            data_path = Path(self.experiment_service.data_path)
-            cropped_path = Path(self.experiment_service.cropped_path)
-            
             # Calculate relative path and create cropped path
-            relative_path = image_path.relative_to(data_path)
-            cropped_image_path = cropped_path / relative_path
+            cropped_image_path = self._cropped_prefix + self.current_image_path[len(self._data_prefix):]
             
             # Create directories if needed
-            cropped_image_path.parent.mkdir(parents=True, exist_ok=True)
+            if ensure_dir:
+                os.makedirs(os.path.dirname(cropped_image_path), exist_ok=True)
             
             # Save the cropped image
-            success = cv2.imwrite(str(cropped_image_path), cropped_image_np)
+            success = cv2.imwrite(cropped_image_path, cropped_image_np)
             
             if success:
                 return success
@@ -257,7 +383,10 @@ class ImageManager:
     
     def get_num_images(self) -> int:
         """Get total number of images in pool."""
-        return len(self.image_pool)
+        if self._num_images is None:
+            self._num_images = sum(len(self._get_pool_folder(position))
+                                   for position in range(len(self._folder_order)))
+        return self._num_images
     
     def get_image_filename(self) -> str:
         """Get relative filename of current image."""
@@ -265,13 +394,12 @@ class ImageManager:
             self.logger.error("No current image path")
             return ""
         
-        try:
-            image_path = Path(self.current_image_path)
-            data_path = Path(self.experiment_service.data_path)
-            return str(image_path.relative_to(data_path))
-        except (ValueError, Exception):
-            self.logger.error(f"Error getting image filename for {self.current_image_path}", exc_info=True)
-            return os.path.basename(self.current_image_path)
+        image_path = self.current_image_path
+        if image_path.startswith(self._data_prefix):
+            return image_path[len(self._data_prefix):]
+        
+        # Image lives outside the data directory
+        return os.path.basename(image_path)
     
     def get_image_mask(self) -> Optional[str]:
         """Get mask path for current image (compatibility method)."""
@@ -283,28 +411,39 @@ class ImageManager:
             self.logger.error("Cannot crop all images: No current experiment selected")
             return
         
-        total_cropped = 0
-        
+        # Collect the work up front; mask lookups share a cache and stay on this thread
+        work = []
         for folder_name in folder_names:
             folder_images = self.get_folder_images_all(folder_name)  # Get all images, not filtered by viewing mode
+            folder_work_start = len(work)
             
             for image_path in folder_images:
-                if self.has_mask(image_path):
-                    try:
-                        # Check if cropped image already exists
-                        cropped_exists = self.cropped_image_exists(image_path)
-                        if not overwrite and cropped_exists:
-
-                            continue
-                        
-                        # Load mask and apply cropping
-                        mask_path = self.get_mask_path(image_path)
-                        if mask_path and self.crop_image_by_mask(image_path, mask_path):
-                            total_cropped += 1
-
-                    except Exception as e:
-                        self.logger.error(f"Error cropping image {image_path}: {e}", exc_info=True)
-                        continue
+                if not self.has_mask(image_path):
+                    continue
+                
+                # Check if cropped image already exists
+                if not overwrite and self.cropped_image_exists(image_path):
+                    continue
+                
+                work.append((image_path, self.get_mask_path(image_path)))
+            
+            # Images in a folder share one output directory, so create it once here
+            if len(work) > folder_work_start:
+                first_image = work[folder_work_start][0]
+                dest_dir = os.path.dirname(self._cropped_prefix + first_image[len(self._data_prefix):])
+                try:
+                    os.makedirs(dest_dir, exist_ok=True)
+                except OSError as e:
+                    self.logger.error(f"Error creating cropped folder {dest_dir}: {e}", exc_info=True)
+                    del work[folder_work_start:]
+        
+        # OpenCV I/O and numpy release the GIL, so threads crop in parallel.
+        # crop_image_by_mask logs and returns False on failure, so one bad
+        # file does not stop the rest.
+        total_cropped = 0
+        if work:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                total_cropped = sum(executor.map(lambda args: self.crop_image_by_mask(*args, ensure_dir=False), work))
         
         self.logger.info(f"Cropped {total_cropped} images")
     
@@ -313,17 +452,18 @@ class ImageManager:
         if not self.current_experiment:
             return []
         
-        folder = next((f for f in self.current_experiment.folders if f.name == folder_name), None)
+        folder = self._folders_by_name.get(folder_name)
         if not folder:
             return []
         
-        image_extensions = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif'}
         all_images = []
         
         try:
-            for file_path in folder.path.iterdir():
-                if file_path.is_file() and file_path.suffix.lower() in image_extensions:
-                    all_images.append(str(file_path))
+            # DirEntry caches the file type from readdir, so is_file() needs no stat()
+            with os.scandir(folder.path) as it:
+                for entry in it:
+                    if _is_image_name(entry.name) and entry.is_file():
+                        all_images.append(entry.path)
         except Exception as e:
             self.logger.error(f"Error getting folder images all for {folder_name}: {e}", exc_info=True)
             return []
@@ -332,21 +472,17 @@ class ImageManager:
     
     def cropped_image_exists(self, image_path: str) -> bool:
         """Check if a cropped version of the image already exists."""
+        if not image_path.startswith(self._data_prefix):
+            return False
+        
         try:
-            image_path = Path(image_path)
-            data_path = Path(self.experiment_service.data_path)
-            cropped_path = Path(self.experiment_service.cropped_path)
-            
-            relative_path = image_path.relative_to(data_path)
-            cropped_image_path = cropped_path / relative_path
-            
-            return cropped_image_path.exists()
-        except (ValueError, Exception):
+            return os.path.exists(self._cropped_prefix + image_path[len(self._data_prefix):])
+        except Exception:
             self.logger.error(f"Error checking if cropped image exists for {image_path}", exc_info=True)
             return False
     
-    def crop_image_by_mask(self, image_path: str, mask_path: str) -> bool:
-        """Crop a specific image by its mask."""
+    def crop_image_by_mask(self, image_path: str, mask_path: str, ensure_dir: bool = True) -> bool:
+        """Crop a specific image by its mask. Pass ensure_dir=False if the output folder already exists."""
         try:
             
             # Load original image
@@ -356,30 +492,33 @@ class ImageManager:
                 return False
             
             # Load mask
-            mask_image = cv2.imread(mask_path, cv2.IMREAD_UNCHANGED)
+            # Masks are written without EXIF, so skip orientation handling
+            mask_image = cv2.imread(mask_path, cv2.IMREAD_UNCHANGED | cv2.IMREAD_IGNORE_ORIENTATION)
             if mask_image is None:
                 self.logger.error(f"Error loading mask image {mask_path}")
                 return False
             
             # Apply mask (set transparent pixels to white)
-            if mask_image.shape[2] == 4:  # RGBA mask
-                transparency_channel = mask_image[:, :, 3]
-                transparency_mask = transparency_channel == 0
-                original_image[transparency_mask] = 255
+            if mask_image.ndim == 3 and mask_image.shape[2] == 4:  # RGBA mask
+                # Keep only the alpha plane and drop the full RGBA decode
+                # before doing the work, so worker threads hold less memory
+                alpha = np.ascontiguousarray(mask_image[:, :, 3])
+                del mask_image
+                # putmask writes in place in C, avoiding a fancy-indexing scatter
+                np.putmask(original_image, alpha == 0, 255)
             
             # Save cropped image
-            image_path_obj = Path(image_path)
-            data_path = Path(self.experiment_service.data_path)
-            cropped_path = Path(self.experiment_service.cropped_path)
-            
-            relative_path = image_path_obj.relative_to(data_path)
-            cropped_image_path = cropped_path / relative_path
+            if not image_path.startswith(self._data_prefix):
+                self.logger.error(f"Image is outside the data directory: {image_path}")
+                return False
+            cropped_image_path = self._cropped_prefix + image_path[len(self._data_prefix):]
             
             # Create directories if needed
-            cropped_image_path.parent.mkdir(parents=True, exist_ok=True)
+            if ensure_dir:
+                os.makedirs(os.path.dirname(cropped_image_path), exist_ok=True)
             
             # Save the cropped image
-            success = cv2.imwrite(str(cropped_image_path), original_image)
+            success = cv2.imwrite(cropped_image_path, original_image)
             if not success:
                 self.logger.error(f"Error saving cropped image {cropped_image_path}")
             return success
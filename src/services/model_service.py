@@ -4,26 +4,63 @@ Streamlined service focused solely on SAM functionality.
 """
 
 import os
+from collections import OrderedDict
+from contextlib import contextmanager
 import numpy as np
 import cv2
-import torch
-from segment_anything import sam_model_registry, SamAutomaticMaskGenerator, SamPredictor
 from utils.logging_config import get_logger
 
+# torch and segment_anything are imported on first use (see _import_sam), so
+# starting the app and browsing images does not pay for CUDA initialisation
+torch = None
+sam_model_registry = None
+SamAutomaticMaskGenerator = None
+SamPredictor = None
+
+# Number of image embeddings kept so revisiting a recent image skips the encoder
+SAM_EMBEDDING_CACHE_SIZE = 8
+
+# Compile the image encoder with torch.compile during warmup. Off by default:
+# compilation takes minutes and only pays off over long sessions
+SAM_COMPILE_ENCODER = False
+
+
+def _import_sam():
+    """Import torch and segment_anything into this module on first call."""
+    global torch, sam_model_registry, SamAutomaticMaskGenerator, SamPredictor
+    if torch is None:
+        import torch as _torch
+        from segment_anything import (
+            sam_model_registry as _registry,
+            SamAutomaticMaskGenerator as _mask_generator,
+            SamPredictor as _predictor,
+        )
+        sam_model_registry = _registry
+        SamAutomaticMaskGenerator = _mask_generator
+        SamPredictor = _predictor
+        torch = _torch
+
 
 class ModelService:
     """Streamlined service for SAM model operations only."""
     
-    def __init__(self, sam_checkpoint_path=None, model_type="vit_h"):
+    def __init__(self, sam_checkpoint_path=None, model_type="vit_h", use_fp16=True, quantize_cpu=False):
         """
         Initialize the SAM model service.
         
         Args:
             sam_checkpoint_path (str): Path to SAM checkpoint file
             model_type (str): SAM model type ('vit_h', 'vit_l', 'vit_b')
+            use_fp16 (bool): Run the image encoder in half precision when on CUDA
+            quantize_cpu (bool): Quantize the image encoder to int8 when on CPU.
+                Off by default, since it changes the masks SAM produces.
         """
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.logger = get_logger(__name__)
+        
+        # Resolved on first access, since it needs torch
+        self._device = None
+        self._fp16_requested = use_fp16
+        self._quantize_cpu = quantize_cpu
 
         # SAM model configuration
         self.sam_checkpoint_path = sam_checkpoint_path or "Models/sam_vit_h_4b8939.pth"
@@ -34,9 +71,41 @@ class ModelService:
         self.predictor = None
         self.mask_generator = None
         self.current_image = None
+        # Factor the current image was shrunk by before encoding, and its full (H, W)
+        self._input_scale = 1.0
+        self._full_size = None
+        # (path, mtime, size) of the image the predictor holds, so edits re-encode
+        self._current_key = None
+        # (path, mtime, size) -> embedding from get_current_embedding, least recent first
+        self._embedding_cache = OrderedDict()
         
-        self.logger.info(f"ModelService initialized with device: {self.device}, model: {self.model_type}")
+        self.logger.info(f"ModelService initialized with model: {self.model_type}")
+    
+    @property
+    def device(self):
+        """Torch device used for SAM, resolved (importing torch) on first access."""
+        if self._device is None:
+            _import_sam()
+            self._device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            self.logger.info(f"SAM device: {self._device}")
+        return self._device
+    
+    @property
+    def use_fp16(self):
+        """Whether SAM runs in half precision; only ever on CUDA, the CPU path stays FP32."""
+        return self._fp16_requested and self.device.type == "cuda"
         
+    def _load_state_dict(self, path):
+        """Load a checkpoint's state dict, memory-mapped where torch supports it."""
+        try:
+            return torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+        except TypeError:
+            # torch < 2.1 has no mmap/weights_only arguments
+            return torch.load(path, map_location="cpu")
+        except RuntimeError:
+            # Legacy (non-zip) checkpoints cannot be memory-mapped; read them whole
+            return torch.load(path, map_location="cpu", weights_only=True)
+    
     def load_sam(self):
         """Load the SAM model from checkpoint."""
         if self.sam_model is not None:
@@ -48,10 +117,16 @@ class ModelService:
                 return False
             
             self.logger.info(f"Loading SAM model ({self.model_type}) from {self.sam_checkpoint_path}")
+            _import_sam()
             
-            # Load SAM model
-            self.sam_model = sam_model_registry[self.model_type](checkpoint=self.sam_checkpoint_path)
+            # Build the model empty and fill it from the memory-mapped checkpoint
+            state_dict = self._load_state_dict(self.sam_checkpoint_path)
+            self.sam_model = sam_model_registry[self.model_type]()
+            self.sam_model.load_state_dict(state_dict)
+            del state_dict
             self.sam_model.to(device=self.device)
+            self.sam_model.eval()
+            self._reduce_encoder_precision()
             
             self.logger.info("SAM model loaded successfully")
             return True
@@ -60,6 +135,59 @@ class ModelService:
             self.logger.error(f"Error loading SAM model: {e}", exc_info=True)
             return False
     
+    def _reduce_encoder_precision(self):
+        """
+        Lower the precision of the image encoder, which dominates SAM's cost.
+        
+        The prompt encoder and mask decoder stay FP32 to preserve mask quality;
+        on CUDA, autocast in _inference handles the FP16 features they receive.
+        """
+        if self.use_fp16:
+            self.sam_model.image_encoder.half()
+        elif self.device.type == "cpu" and self._quantize_cpu:
+            try:
+                self.sam_model.image_encoder = torch.quantization.quantize_dynamic(
+                    self.sam_model.image_encoder, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                self.logger.info("SAM image encoder quantized to int8")
+            except Exception as e:
+                # No quantized engine on this platform; stay in FP32
+                self.logger.warning(f"Could not quantize SAM image encoder, using FP32: {e}")
+    
+    def warmup(self):
+        """
+        Run one dummy encoder pass so the first real image does not pay for kernel setup.
+        
+        Only done on CUDA, where the first pass triggers cuDNN autotuning and
+        allocator growth; on CPU it would just burn seconds of compute.
+        
+        Returns:
+            bool: True if a warmup pass was run, False otherwise
+        """
+        if self.sam_model is None or self.device.type != "cuda":
+            return False
+        
+        try:
+            encoder = self.sam_model.image_encoder
+            size = encoder.img_size
+            if SAM_COMPILE_ENCODER and hasattr(torch, "compile"):
+                # Input is always padded to img_size, so specialise to that one shape
+                encoder = torch.compile(encoder, mode="reduce-overhead", dynamic=False)
+                self.sam_model.image_encoder = encoder
+            
+            dtype = torch.float16 if self.use_fp16 else torch.float32
+            dummy = torch.zeros(1, 3, size, size, device=self.device, dtype=dtype)
+            with self._inference():
+                encoder(dummy)
+            torch.cuda.synchronize()
+            
+            self.logger.info("SAM image encoder warmed up")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error warming up SAM model: {e}", exc_info=True)
+            return False
+    
     def set_sam_predictor(self, image_path):
         """
         Set up SAM predictor for a specific image.
@@ -76,23 +204,56 @@ class ModelService:
                 if not self.load_sam():
                     return False
             
-            # Load and prepare image
-            image = cv2.imread(image_path)
+            # Key on modification time and size too, so an image edited or
+            # replaced on disk is encoded again rather than served stale
+            stat_result = os.stat(image_path)
+            key = (image_path, stat_result.st_mtime_ns, stat_result.st_size)
+            
+            # The image embedding is already computed for this image
+            if self.predictor is not None and self._current_key == key:
+                return True
+            
+            # Restore a recently computed embedding instead of re-running the encoder
+            cached = self._embedding_cache.get(key)
+            if cached is not None:
+                self._embedding_cache.move_to_end(key)
+                self.set_predictor_from_embedding(image_path, cached)
+                self._current_key = key
+                self.logger.debug(f"SAM embedding reused for image: {os.path.basename(image_path)}")
+                return True
+            
+            # Load and prepare image; IMREAD_COLOR expands grayscale to 3 channels
+            image = cv2.imread(image_path, cv2.IMREAD_COLOR)
             if image is None:
                 self.logger.error(f"Could not load image: {image_path}")
                 raise ValueError(f"Could not load image: {image_path}")
             
-            # Handle grayscale images
-            if len(image.shape) == 2:
-                image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
-            elif image.shape[2] == 3:
-                # Convert BGR to RGB (SAM expects RGB)
-                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            # Convert BGR to RGB in place (SAM expects RGB)
+            cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+            
+            # The encoder resizes to its input size anyway, so shrink large images
+            # once on the CPU; prompts and masks are mapped back in add_predictor_point
+            self._full_size = image.shape[:2]
+            target = self.sam_model.image_encoder.img_size
+            self._input_scale = min(1.0, target / max(self._full_size))
+            if self._input_scale < 1.0:
+                image = cv2.resize(image, None, fx=self._input_scale, fy=self._input_scale,
+                                   interpolation=cv2.INTER_AREA)
             
             # Initialize predictor and set image
-            self.predictor = SamPredictor(self.sam_model)
-            self.predictor.set_image(image)
+            if self.predictor is None:
+                self.predictor = SamPredictor(self.sam_model)
+            with self._inference():
+                self.predictor.set_image(image)
             self.current_image = image_path
+            self._current_key = key
+            
+            # Drop embeddings of earlier versions of this file before caching the new one
+            for stale in [k for k in self._embedding_cache if k[0] == image_path]:
+                del self._embedding_cache[stale]
+            self._embedding_cache[key] = self.get_current_embedding()
+            if len(self._embedding_cache) > SAM_EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
             
             self.logger.debug(f"SAM predictor set for image: {os.path.basename(image_path)}")
             return True
@@ -101,16 +262,53 @@ class ModelService:
             self.logger.error(f"Error setting SAM predictor for {image_path}: {e}", exc_info=True)
             return False
     
+    def get_current_embedding(self):
+        """
+        Get the predictor's image embedding and the sizes needed to reuse it.
+        
+        Returns:
+            dict: Embedding state, or None if no image is set
+        """
+        if self.predictor is None or not self.predictor.is_image_set:
+            return None
+        return {
+            'features': self.predictor.features,
+            'original_size': self.predictor.original_size,
+            'input_size': self.predictor.input_size,
+            'input_scale': self._input_scale,
+            'full_size': self._full_size,
+        }
+    
+    def set_predictor_from_embedding(self, image_path, embedding):
+        """
+        Point the predictor at a previously computed embedding without re-encoding.
+        
+        Args:
+            image_path (str): Path of the image the embedding was computed for
+            embedding (dict): State returned by get_current_embedding
+        """
+        if self.predictor is None:
+            self.predictor = SamPredictor(self.sam_model)
+        self.predictor.features = embedding['features']
+        self.predictor.original_size = embedding['original_size']
+        self.predictor.input_size = embedding['input_size']
+        self.predictor.is_image_set = True
+        self._input_scale = embedding['input_scale']
+        self._full_size = embedding['full_size']
+        self.current_image = image_path
+        # Which file version this is is only known to set_sam_predictor
+        self._current_key = None
+    
     def add_predictor_point(self, input_points, input_labels=None):
         """
         Generate segmentation mask using point prompts.
         
         Args:
-            input_points (np.ndarray): Array of (x, y) coordinates  
-            input_labels (np.ndarray): Array of labels (1 for foreground, 0 for background)
+            input_points (np.ndarray | torch.Tensor): Array of (x, y) coordinates in the full-size image
+            input_labels (np.ndarray | torch.Tensor): Array of labels (1 for foreground, 0 for background)
             
         Returns:
-            np.ndarray: Best segmentation mask or None if failed
+            np.ndarray: Best segmentation mask at full image size, or None if failed
         """
         try:
             if self.predictor is None:
@@ -120,21 +318,38 @@ class ModelService:
             if input_labels is None:
                 input_labels = np.ones(len(input_points), dtype=int)
             
-            # Ensure correct format
-            input_points = np.array(input_points, dtype=np.float32)
-            input_labels = np.array(input_labels, dtype=int)
+            # Build batched (1xNx2 / 1xN) tensors directly on the model device,
+            # skipping the numpy layer of predictor.predict()
+            if not isinstance(input_points, torch.Tensor):
+                input_points = torch.as_tensor(np.asarray(input_points, dtype=np.float32), device=self.device).unsqueeze(0)
+            if self._input_scale != 1.0:
+                # Map prompts into the downscaled image the embedding was computed from
+                input_points = input_points * self._input_scale
+            if not isinstance(input_labels, torch.Tensor):
+                input_labels = torch.as_tensor(np.asarray(input_labels), dtype=torch.int, device=self.device).unsqueeze(0)
             
-            # Generate predictions
-            masks, scores, logits = self.predictor.predict(
-                point_coords=input_points,
-                point_labels=input_labels,
-                multimask_output=True,
-            )
+            # Generate predictions for all points in one decoder pass. A lone point
+            # is ambiguous, so ask for several candidates; more points pin down
+            # one object, and a single mask is both cheaper and better
+            with self._inference():
+                point_coords = self.predictor.transform.apply_coords_torch(input_points, self.predictor.original_size)
+                masks, scores, logits = self.predictor.predict_torch(
+                    point_coords=point_coords,
+                    point_labels=input_labels,
+                    multimask_output=input_points.shape[1] == 1,
+                )
             
-            # Return the mask with the highest score
-            best_mask_idx = np.argmax(scores)
-            best_mask = masks[best_mask_idx]
+            # Pick the highest-scoring mask on the device so only that one
+            # full-resolution mask is copied back to the host
+            best_mask_idx = scores.argmax(dim=1)
+            best_mask = masks[torch.arange(masks.shape[0], device=masks.device), best_mask_idx]
+            best_mask = best_mask[0].cpu().numpy()
             
+            if self._input_scale != 1.0:
+                # Back to full resolution; nearest keeps the mask binary
+                height, width = self._full_size
+                best_mask = cv2.resize(best_mask.view(np.uint8), (width, height),
+                                       interpolation=cv2.INTER_NEAREST).view(np.bool_)
 
             return best_mask
             
@@ -160,13 +375,12 @@ class ModelService:
                     return []
             
             # Load image
-            image = cv2.imread(image_path)
+            image = cv2.imread(image_path, cv2.IMREAD_COLOR)
             if image is None:
                 raise ValueError(f"Could not load image: {image_path}")
             
-            # Convert BGR to RGB
-            if len(image.shape) == 3:
-                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            # Convert BGR to RGB in place
+            cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
             
             # Initialize mask generator
             if self.mask_generator is None:
@@ -176,7 +390,8 @@ class ModelService:
                 )
             
             # Generate masks
-            masks = self.mask_generator.generate(image)
+            with self._inference():
+                masks = self.mask_generator.generate(image)
 
             return masks
             
@@ -184,26 +399,39 @@ class ModelService:
             self.logger.error(f"Error auto segmenting image {image_path}: {e}", exc_info=True)
             return []
     
+    @contextmanager
+    def _inference(self):
+        """Context for SAM inference: no autograd, and FP16 autocast when enabled."""
+        with torch.inference_mode(), torch.autocast("cuda", dtype=torch.float16, enabled=self.use_fp16):
+            yield
+    
     def is_sam_available(self):
         """Check if SAM model is available and loaded."""
         return self.sam_model is not None
     
     def get_device_info(self):
         """Get information about the current device and SAM state."""
+        # Report without importing torch if SAM has not been used yet
+        device_resolved = self._device is not None
         return {
-            'device': str(self.device),
-            'cuda_available': torch.cuda.is_available(),
+            'device': str(self._device) if device_resolved else None,
+            'cuda_available': device_resolved and self._device.type == "cuda",
             'sam_loaded': self.sam_model is not None,
             'predictor_ready': self.predictor is not None,
             'current_image': self.current_image,
             'checkpoint_path': self.sam_checkpoint_path,
-            'model_type': self.model_type
+            'model_type': self.model_type,
+            'use_fp16': device_resolved and self.use_fp16,
+            'quantize_cpu': self._quantize_cpu
         }
     
     def clear_predictor(self):
         """Clear the current predictor state."""
         self.predictor = None
         self.current_image = None
+        self._current_key = None
+        self._input_scale = 1.0
+        self._full_size = None
     
     def unload_sam(self):
         """Unload the SAM model to free memory."""
@@ -211,7 +439,9 @@ class ModelService:
         self.predictor = None
         self.mask_generator = None
         self.current_image = None
+        self._current_key = None
+        self._embedding_cache.clear()
         
         # Force garbage collection
-        if torch.cuda.is_available():
+        if torch is not None and torch.cuda.is_available():
             torch.cuda.empty_cache()
\ No newline at end of file
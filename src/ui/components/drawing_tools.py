@@ -2,12 +2,23 @@
 Drawing tools widget with brush, marker, and clear buttons.
 """
 
-from PySide6.QtWidgets import QWidget, QHBoxLayout, QPushButton, QButtonGroup, QVBoxLayout, QLabel, QSlider, QCheckBox, QGroupBox
-from PySide6.QtCore import Qt, Signal
-from core.events import event_bus, Event, EventType
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QPushButton, QButtonGroup, QVBoxLayout, QLabel, QSlider, QCheckBox, QGroupBox, QAbstractButton
+from PySide6.QtCore import Qt, Signal, Slot, QTimer
+from core.events import event_bus, Event, EventType, shared_event
 from core.base import ToolType
 
 
+# Quiet period before a dragged slider's value is emitted downstream
+SLIDER_EMIT_DELAY_MS = 120
+# Slider value labels are repainted at most once per frame (~60 Hz)
+LABEL_UPDATE_INTERVAL_MS = 16
+
+# Label text for every slider position, built once so dragging allocates nothing
+_SIZE_LABELS = tuple(str(i) for i in range(201))
+_OPACITY_LABELS = tuple(f"{i}%" for i in range(101))
+_THRESHOLD_LABELS = tuple(str(i) for i in range(256))
+
+
 class DrawingTools(QWidget):
     """Widget containing drawing tools and controls."""
     
@@ -86,28 +97,13 @@ class DrawingTools(QWidget):
         
         sam_group.setLayout(sam_layout)
         
-        # Threshold section
-        threshold_group = QGroupBox("Threshold")
-        threshold_layout = QVBoxLayout()
-        
-        # Threshold button
-        self.threshold_button = QPushButton("Apply Threshold")
-        self.threshold_button.clicked.connect(self.on_threshold_clicked)
-        threshold_layout.addWidget(self.threshold_button)
-        
-        # Threshold slider
-        threshold_slider_layout = QHBoxLayout()
-        self.threshold_slider = QSlider(Qt.Horizontal)
-        self.threshold_slider.setRange(0, 255)
-        self.threshold_slider.setValue(127)
-        self.threshold_slider.valueChanged.connect(self.on_threshold_changed)
-        self.threshold_label = QLabel("127")
-        self.threshold_label.setMinimumWidth(30)
-        threshold_slider_layout.addWidget(self.threshold_slider)
-        threshold_slider_layout.addWidget(self.threshold_label)
-        threshold_layout.addLayout(threshold_slider_layout)
-        
-        threshold_group.setLayout(threshold_layout)
+        # Threshold section: an empty placeholder now, filled by
+        # _build_threshold_group once the window has been shown
+        self.threshold_group = None
+        self._threshold_placeholder = QWidget()
+        placeholder_layout = QVBoxLayout(self._threshold_placeholder)
+        placeholder_layout.setContentsMargins(0, 0, 0, 0)
+        self._tools_enabled = True
         
         # Clear button
         self.clear_btn = QPushButton("Clear Mask")
@@ -116,7 +112,7 @@ class DrawingTools(QWidget):
         # Add all sections to mask tools
         mask_tools_layout.addWidget(brush_group)
         mask_tools_layout.addWidget(sam_group)
-        mask_tools_layout.addWidget(threshold_group)
+        mask_tools_layout.addWidget(self._threshold_placeholder)
         mask_tools_layout.addWidget(self.clear_btn)
         
         mask_tools_group.setLayout(mask_tools_layout)
@@ -129,68 +125,169 @@ class DrawingTools(QWidget):
         self.tool_group.addButton(self.brush_btn, 0)
         self.tool_group.addButton(self.marker_btn, 1)
         
+        # Tool and its signal value for each tool button
+        self._button_to_tool = {
+            self.brush_btn: (ToolType.BRUSH, ToolType.BRUSH.value),
+            self.marker_btn: (ToolType.MARKER, ToolType.MARKER.value),
+        }
+        
+        # Slider labels are written at most once per frame; the latest text
+        # for each label waits here until the timer flushes it
+        self._pending_labels = {}
+        self._label_update_timer = QTimer(self)
+        self._label_update_timer.setSingleShot(True)
+        self._label_update_timer.setInterval(LABEL_UPDATE_INTERVAL_MS)
+        self._label_update_timer.timeout.connect(self._flush_label_updates)
+        
+        # Debounce slider emits: labels follow the drag, but downstream
+        # listeners only see the value once the drag pauses or is released
+        self._size_emit_timer = QTimer(self)
+        self._size_emit_timer.setSingleShot(True)
+        self._size_emit_timer.timeout.connect(self.emit_brush_size)
+        self._opacity_emit_timer = QTimer(self)
+        self._opacity_emit_timer.setSingleShot(True)
+        self._opacity_emit_timer.timeout.connect(self.emit_opacity)
+        
+        # Bound methods used by the slider and checkbox handlers, looked up once
+        # here rather than through attribute chains on every drag step
+        self._get_brush_size = self.size_slider.value
+        self._get_opacity = self.opacity_slider.value
+        self._is_auto_sam = self.auto_sam_checkbox.isChecked
+        self._start_size_emit = self._size_emit_timer.start
+        self._start_opacity_emit = self._opacity_emit_timer.start
+        
         # Connect signals
         self.tool_group.buttonClicked.connect(self.on_tool_changed)
         self.clear_btn.clicked.connect(self.on_clear_clicked)
         self.size_slider.valueChanged.connect(self.on_size_changed)
+        self.size_slider.sliderReleased.connect(self.emit_brush_size)
         self.opacity_slider.valueChanged.connect(self.on_opacity_changed)
+        self.opacity_slider.sliderReleased.connect(self.emit_opacity)
+    
+    def showEvent(self, event):
+        """Schedule the deferred threshold controls on first show."""
+        super().showEvent(event)
+        if self.threshold_group is None:
+            # Build on the next loop iteration so the first paint is not delayed
+            QTimer.singleShot(0, self._build_threshold_group)
+    
+    def _build_threshold_group(self):
+        """Create the threshold controls and swap them into their placeholder."""
+        if self.threshold_group is not None:
+            return
+        
+        threshold_group = QGroupBox("Threshold")
+        threshold_layout = QVBoxLayout()
+        
+        # Threshold button
+        self.threshold_button = QPushButton("Apply Threshold")
+        self.threshold_button.setEnabled(self._tools_enabled)
+        self.threshold_button.clicked.connect(self.on_threshold_clicked)
+        threshold_layout.addWidget(self.threshold_button)
+        
+        # Threshold slider
+        threshold_slider_layout = QHBoxLayout()
+        self.threshold_slider = QSlider(Qt.Horizontal)
+        self.threshold_slider.setRange(0, 255)
+        self.threshold_slider.setValue(127)
+        self.threshold_label = QLabel("127")
+        self.threshold_label.setMinimumWidth(30)
+        threshold_slider_layout.addWidget(self.threshold_slider)
+        threshold_slider_layout.addWidget(self.threshold_label)
+        threshold_layout.addLayout(threshold_slider_layout)
+        
+        threshold_group.setLayout(threshold_layout)
+        
+        self._get_threshold = self.threshold_slider.value
         self.threshold_slider.valueChanged.connect(self.on_threshold_changed)
+        
+        self._threshold_placeholder.layout().addWidget(threshold_group)
+        self.threshold_group = threshold_group
     
+    @Slot(QAbstractButton)
     def on_tool_changed(self, button):
         """Handle tool selection change."""
-        if button == self.brush_btn:
-            self.current_tool = ToolType.BRUSH
-        elif button == self.marker_btn:
-            self.current_tool = ToolType.MARKER
+        tool_entry = self._button_to_tool.get(button)
+        if tool_entry is None:
+            return
+        self.current_tool, tool_value = tool_entry
         
         # Emit local signal
-        self.tool_changed.emit(self.current_tool.value)
+        self.tool_changed.emit(tool_value)
         
         # Publish global event
-        event_bus.publish(Event(
+        event_bus.publish_async(Event(
             event_type=EventType.TOOL_CHANGED,
-            data={"tool": self.current_tool.value},
+            data={"tool": tool_value},
             source="drawing_tools"
         ))
     
+    @Slot()
     def on_clear_clicked(self):
         """Handle clear button click."""
-        event_bus.publish(Event(
-            event_type=EventType.MASK_CLEARED,
-            source="drawing_tools"
-        ))
+        event_bus.publish_async(shared_event(EventType.MASK_CLEARED, source="drawing_tools"))
     
+    @Slot(int)
     def on_size_changed(self, value):
         """Handle brush size change."""
-        self.size_label.setText(str(value))
-        self.brush_size_changed.emit(value)
+        self._queue_label_update(self.size_label, _SIZE_LABELS[value])
+        self._start_size_emit(SLIDER_EMIT_DELAY_MS)
+    
+    @Slot()
+    def emit_brush_size(self):
+        """Emit the current brush size, cancelling any pending debounced emit."""
+        self._size_emit_timer.stop()
+        self.brush_size_changed.emit(self._get_brush_size())
     
+    @Slot(int)
     def on_opacity_changed(self, value):
         """Handle opacity change."""
-        self.opacity_label.setText(f"{value}%")
-        self.opacity_changed.emit(value)
+        self._queue_label_update(self.opacity_label, _OPACITY_LABELS[value])
+        self._start_opacity_emit(SLIDER_EMIT_DELAY_MS)
     
+    @Slot()
+    def emit_opacity(self):
+        """Emit the current opacity, cancelling any pending debounced emit."""
+        self._opacity_emit_timer.stop()
+        self.opacity_changed.emit(self._get_opacity())
+    
+    @Slot(int)
     def on_auto_sam_toggled(self, state):
         """Handle Auto SAM checkbox state change."""
         # Use the checkbox's isChecked() method for reliable state detection
-        is_checked = self.auto_sam_checkbox.isChecked()
+        is_checked = self._is_auto_sam()
 
         self.auto_sam_toggled.emit(is_checked)
         
         # Publish global event
-        event_bus.publish(Event(
+        event_bus.publish_async(Event(
             event_type=EventType.AUTO_SAM_TOGGLED,
             data={"enabled": is_checked},
             source="drawing_tools"
         ))
     
+    @Slot(int)
     def on_threshold_changed(self, value):
         """Handle threshold slider change."""
-        self.threshold_label.setText(str(value))
+        self._queue_label_update(self.threshold_label, _THRESHOLD_LABELS[value])
+    
+    def _queue_label_update(self, label, text):
+        """Record a label's new text and schedule a flush if none is pending."""
+        self._pending_labels[label] = text
+        if not self._label_update_timer.isActive():
+            self._label_update_timer.start()
+    
+    @Slot()
+    def _flush_label_updates(self):
+        """Apply all pending slider label texts in one pass."""
+        pending, self._pending_labels = self._pending_labels, {}
+        for label, text in pending.items():
+            label.setText(text)
     
+    @Slot()
     def on_threshold_clicked(self):
         """Handle threshold button click."""
-        threshold_value = self.threshold_slider.value()
+        threshold_value = self._get_threshold()
         self.threshold_applied.emit(threshold_value)
     
     def get_current_tool(self) -> ToolType:
@@ -208,12 +305,14 @@ class DrawingTools(QWidget):
     
     def is_auto_sam_enabled(self) -> bool:
         """Check if Auto SAM checkbox is enabled."""
-        return self.auto_sam_checkbox.isChecked()
+        return self._is_auto_sam()
     
     def set_tools_enabled(self, enabled: bool):
         """Enable/disable drawing tools based on image availability."""
         self.brush_btn.setEnabled(enabled)
         self.marker_btn.setEnabled(enabled)
         self.auto_sam_checkbox.setEnabled(enabled)
-        self.threshold_button.setEnabled(enabled)
+        self._tools_enabled = enabled
+        if self.threshold_group is not None:
+            self.threshold_button.setEnabled(enabled)
         self.clear_btn.setEnabled(enabled)
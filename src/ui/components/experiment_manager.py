@@ -3,8 +3,11 @@ Experiment manager widget for selecting and managing experiments.
 """
 
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QComboBox, QLabel
-from PySide6.QtCore import Signal
-from core.events import event_bus, Event, EventType
+from PySide6.QtCore import QSignalBlocker, QTimer, Signal, Slot
+from core.events import event_bus, EventType, shared_event
+
+# Minimum spacing between experiment switches while scrolling through the dropdown
+EXPERIMENT_SELECT_INTERVAL_MS = 50
 
 
 class ExperimentManager(QWidget):
@@ -16,6 +19,16 @@ class ExperimentManager(QWidget):
     def __init__(self, experiment_service):
         super().__init__()
         self.experiment_service = experiment_service
+        # Experiments in dropdown order, refreshed only at load/refresh time
+        self._experiments_cache = []
+        
+        # Leading/trailing throttle for dropdown changes: the first index of a
+        # burst is applied at once, the latest of the rest when the interval ends
+        self._select_timer = QTimer(self)
+        self._select_timer.setSingleShot(True)
+        self._select_timer.setInterval(EXPERIMENT_SELECT_INTERVAL_MS)
+        self._select_timer.timeout.connect(self._flush_selection)
+        self._pending_index = None
         self.init_ui()
         self.load_experiments()
     
@@ -48,15 +61,20 @@ class ExperimentManager(QWidget):
     
     def load_experiments(self):
         """Load experiments into dropdown."""
-        experiments = self.experiment_service.get_experiments()
-        self.experiment_dropdown.clear()
+        experiments = self._experiments_cache = self.experiment_service.get_experiments()
         
-        if experiments:
+        # Fill silently; clear()/addItems() would otherwise fire index changes
+        with QSignalBlocker(self.experiment_dropdown):
+            self.experiment_dropdown.clear()
             self.experiment_dropdown.addItems([exp.name for exp in experiments])
-            # Set first experiment as current
+        
+        if experiments:
+            # Set first experiment as current without emitting experiment_changed:
+            # nothing is connected yet, so the owner reads get_current_experiment()
+            # once it has wired its handlers
             self.experiment_service.set_current_experiment(experiments[0])
-            self.experiment_changed.emit(experiments[0])
     
+    @Slot()
     def refresh_experiments(self):
         """Refresh the experiment list."""
         current_text = self.experiment_dropdown.currentText()
@@ -64,41 +82,53 @@ class ExperimentManager(QWidget):
         # Refresh experiments from file system
         self.experiment_service.refresh_experiments()
         
-        # Update dropdown
-        self.experiment_dropdown.clear()
-        experiments = self.experiment_service.get_experiments()
+        experiments = self._experiments_cache = self.experiment_service.get_experiments()
+        experiment_names = [exp.name for exp in experiments]
+        current_names = [self.experiment_dropdown.itemText(i) for i in range(self.experiment_dropdown.count())]
+        
+        if experiment_names != current_names:
+            # Rebuild silently; clear()/addItems() would otherwise fire an
+            # index change per step, each selecting an experiment
+            with QSignalBlocker(self.experiment_dropdown):
+                self.experiment_dropdown.clear()
+                self.experiment_dropdown.addItems(experiment_names)
+                
+                # Try to restore previous selection
+                index = self.experiment_dropdown.findText(current_text)
+                if experiments:
+                    self.experiment_dropdown.setCurrentIndex(max(index, 0))
         
         if experiments:
-            self.experiment_dropdown.addItems([exp.name for exp in experiments])
-            
-            # Try to restore previous selection
-            index = self.experiment_dropdown.findText(current_text)
-            if index >= 0:
-                self.experiment_dropdown.setCurrentIndex(index)
-            else:
-                self.experiment_service.set_current_experiment(experiments[0])
-                self.experiment_changed.emit(experiments[0])
+            # Select once so listeners pick up the rescanned experiment
+            self.on_experiment_changed(self.experiment_dropdown.currentIndex())
         
         # Publish refresh event for other components
-        event_bus.publish(Event(
-            event_type=EventType.EXPERIMENT_REFRESHED,
-            source="experiment_manager"
-        ))
+        event_bus.publish_async(shared_event(EventType.EXPERIMENT_REFRESHED, source="experiment_manager"))
     
+    @Slot(int)
     def on_experiment_changed(self, index):
-        """Handle experiment dropdown change."""
-        experiments = self.experiment_service.get_experiments()
+        """Handle experiment dropdown change, switching at most once per interval."""
+        if self._select_timer.isActive():
+            self._pending_index = index
+            return
+        self._select_timer.start()
+        self._select_experiment(index)
+    
+    def _flush_selection(self):
+        """Apply the last index chosen during a throttle interval, if any."""
+        index, self._pending_index = self._pending_index, None
+        if index is not None:
+            self._select_timer.start()
+            self._select_experiment(index)
+    
+    def _select_experiment(self, index):
+        """Make the experiment at a dropdown index current and notify listeners."""
+        experiments = self._experiments_cache
         if 0 <= index < len(experiments):
             selected_experiment = experiments[index]
+            # The service publishes the one EXPERIMENT_CHANGED bus event
             self.experiment_service.set_current_experiment(selected_experiment)
             self.experiment_changed.emit(selected_experiment)
-            
-            # Publish global event
-            event_bus.publish(Event(
-                event_type=EventType.EXPERIMENT_CHANGED,
-                data={"experiment": selected_experiment},
-                source="experiment_manager"
-            ))
     
     def get_current_experiment(self):
         """Get the currently selected experiment."""
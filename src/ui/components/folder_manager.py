@@ -2,10 +2,13 @@
 Folder manager widget for handling unlabelled and labelled image folder selection.
 """
 
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                               QGroupBox, QListWidget, QListWidgetItem)
-from PySide6.QtCore import Qt, Signal
-from core.events import event_bus, Event, EventType
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QGroupBox,
+                               QListView, QListWidget, QListWidgetItem)
+from PySide6.QtCore import QSignalBlocker, Qt, Signal, Slot
+from core.events import event_bus, EventType, shared_event
+
+# Group box title for each viewing mode
+MODE_TITLES = {"unlabelled": "Unlabelled Images", "labelled": "Labelled Images"}
 
 
 class FolderManager(QWidget):
@@ -13,11 +16,16 @@ class FolderManager(QWidget):
     
     # Signals
     folders_changed = Signal(list)  # Emitted when selected folders change
-    image_source_toggled = Signal(str)  # Emitted when switching between unlabelled/labelled
+    mode_and_folders_changed = Signal(str, list)  # Emitted once when switching between unlabelled/labelled
     
     def __init__(self):
         super().__init__()
         self.current_mode = "unlabelled"  # Track current viewing mode
+        
+        # Folder names and checked names for each mode. Only the current
+        # mode is shown; the list widget is refilled from these on toggle.
+        self._folder_names = {"unlabelled": [], "labelled": []}
+        self._checked_folders = {"unlabelled": set(), "labelled": set()}
         self.init_ui()
         self.connect_events()
     
@@ -30,57 +38,32 @@ class FolderManager(QWidget):
         self.toggle_button.clicked.connect(self.toggle_image_source)
         layout.addWidget(self.toggle_button)
         
-        # Data source layout - side by side groups
-        data_source_layout = QHBoxLayout()
-        
-        # Unlabelled images group
-        self.unlabelled_group = QGroupBox("Unlabelled Images")
-        self.unlabelled_group.setEnabled(True)
-        unlabelled_layout = QVBoxLayout()
-        
-        # Unlabelled control buttons
-        unlabelled_buttons = QHBoxLayout()
-        self.select_all_unlabelled_button = QPushButton("Select All")
-        self.select_all_unlabelled_button.clicked.connect(self.select_all_unlabelled)
-        self.deselect_all_unlabelled_button = QPushButton("Deselect All")
-        self.deselect_all_unlabelled_button.clicked.connect(self.deselect_all_unlabelled)
-        
-        unlabelled_buttons.addWidget(self.select_all_unlabelled_button)
-        unlabelled_buttons.addWidget(self.deselect_all_unlabelled_button)
-        unlabelled_layout.addLayout(unlabelled_buttons)
-        
-        # Unlabelled folder list
-        self.unlabelled_list = QListWidget()
-        self.unlabelled_list.itemChanged.connect(self.on_folder_selection_changed)
-        unlabelled_layout.addWidget(self.unlabelled_list)
-        self.unlabelled_group.setLayout(unlabelled_layout)
-        
-        # Labelled images group
-        self.labelled_group = QGroupBox("Labelled Images")
-        self.labelled_group.setEnabled(False)
-        labelled_layout = QVBoxLayout()
-        
-        # Labelled control buttons
-        labelled_buttons = QHBoxLayout()
-        self.select_all_labelled_button = QPushButton("Select All")
-        self.select_all_labelled_button.clicked.connect(self.select_all_labelled)
-        self.deselect_all_labelled_button = QPushButton("Deselect All")
-        self.deselect_all_labelled_button.clicked.connect(self.deselect_all_labelled)
-        
-        labelled_buttons.addWidget(self.select_all_labelled_button)
-        labelled_buttons.addWidget(self.deselect_all_labelled_button)
-        labelled_layout.addLayout(labelled_buttons)
-        
-        # Labelled folder list
-        self.labelled_list = QListWidget()
-        self.labelled_list.itemChanged.connect(self.on_folder_selection_changed)
-        labelled_layout.addWidget(self.labelled_list)
-        self.labelled_group.setLayout(labelled_layout)
-        
-        # Add groups to data source layout
-        data_source_layout.addWidget(self.unlabelled_group)
-        data_source_layout.addWidget(self.labelled_group)
-        layout.addLayout(data_source_layout)
+        # Folder group for the current image source
+        self.folder_group = QGroupBox(MODE_TITLES[self.current_mode])
+        folder_layout = QVBoxLayout()
+        
+        # Control buttons
+        folder_buttons = QHBoxLayout()
+        self.select_all_button = QPushButton("Select All")
+        self.select_all_button.clicked.connect(self.select_all)
+        self.deselect_all_button = QPushButton("Deselect All")
+        self.deselect_all_button.clicked.connect(self.deselect_all)
+        
+        folder_buttons.addWidget(self.select_all_button)
+        folder_buttons.addWidget(self.deselect_all_button)
+        folder_layout.addLayout(folder_buttons)
+        
+        # Folder list
+        self.folder_list = QListWidget()
+        # All rows are single-line text, so measure one row and lay out in batches
+        self.folder_list.setUniformItemSizes(True)
+        self.folder_list.setLayoutMode(QListView.Batched)
+        self.folder_list.setBatchSize(100)
+        self.folder_list.itemChanged.connect(self._on_item_changed)
+        folder_layout.addWidget(self.folder_list)
+        self.folder_group.setLayout(folder_layout)
+        
+        layout.addWidget(self.folder_group)
         
         self.setLayout(layout)
     
@@ -95,96 +78,98 @@ class FolderManager(QWidget):
     def refresh_folders(self):
         """Refresh the folder lists when experiment changes."""
         # Emit signal to request folder refresh from experiment level
-        event_bus.publish(Event(
-            event_type=EventType.FOLDER_REFRESH_REQUESTED,
-            source="folder_manager"
-        ))
+        event_bus.publish_async(shared_event(EventType.FOLDER_REFRESH_REQUESTED, source="folder_manager"))
     
+    @Slot()
     def toggle_image_source(self):
         """Toggle between labeled and unlabeled image sources."""
-        if self.unlabelled_group.isEnabled():
-            self.unlabelled_group.setEnabled(False)
-            self.labelled_group.setEnabled(True)
-            self.current_mode = "labelled"
-        else:
-            self.labelled_group.setEnabled(False)
-            self.unlabelled_group.setEnabled(True)
-            self.current_mode = "unlabelled"
-        
-        # Emit signal about mode change
-        self.image_source_toggled.emit(self.current_mode)
+        self.current_mode = "labelled" if self.current_mode == "unlabelled" else "unlabelled"
+        self.folder_group.setTitle(MODE_TITLES[self.current_mode])
+        self._show_current_folders()
         
-        # Update folder selection
-        self.on_folder_selection_changed()
+        # Report the new mode and its folder selection together
+        self.mode_and_folders_changed.emit(self.current_mode, self.get_selected_folders())
     
     def load_unlabelled_folders(self, experiment):
         """Load unlabeled folders from experiment."""
-        self.unlabelled_list.clear()
-        if experiment:
-            for folder in experiment.folders:
-                item = QListWidgetItem(folder.name)
-                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-                item.setCheckState(Qt.Unchecked)
-                self.unlabelled_list.addItem(item)
+        names = [folder.name for folder in experiment.folders] if experiment else []
+        self._set_folder_names("unlabelled", names)
     
     def load_labelled_folders(self, experiment):
         """Load labeled folders from experiment."""
-        self.labelled_list.clear()
-        if experiment:
-            for folder in experiment.folders:
-                if folder.has_labels:
-                    item = QListWidgetItem(folder.name)
-                    item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-                    item.setCheckState(Qt.Unchecked)
-                    self.labelled_list.addItem(item)
-    
-    def select_all_unlabelled(self):
-        """Select all unlabeled folders."""
-        for index in range(self.unlabelled_list.count()):
-            item = self.unlabelled_list.item(index)
-            item.setCheckState(Qt.Checked)
-    
-    def deselect_all_unlabelled(self):
-        """Deselect all unlabeled folders."""
-        for index in range(self.unlabelled_list.count()):
-            item = self.unlabelled_list.item(index)
-            item.setCheckState(Qt.Unchecked)
-    
-    def select_all_labelled(self):
-        """Select all labeled folders."""
-        for index in range(self.labelled_list.count()):
-            item = self.labelled_list.item(index)
-            item.setCheckState(Qt.Checked)
-    
-    def deselect_all_labelled(self):
-        """Deselect all labeled folders."""
-        for index in range(self.labelled_list.count()):
-            item = self.labelled_list.item(index)
-            item.setCheckState(Qt.Unchecked)
+        names = [folder.name for folder in experiment.folders if folder.has_labels] if experiment else []
+        self._set_folder_names("labelled", names)
+    
+    def _set_folder_names(self, mode, names):
+        """Replace a mode's folders, all unchecked, refreshing the list if that mode is shown."""
+        unchanged = names == self._folder_names[mode]
+        self._folder_names[mode] = names
+        self._checked_folders[mode].clear()
+        
+        if mode != self.current_mode:
+            return
+        if unchanged:
+            # Same folders: just reset the check states
+            self._set_item_check_states(Qt.Unchecked)
+        else:
+            self._show_current_folders()
+    
+    def _show_current_folders(self):
+        """Fill the list widget from the current mode's folders and check states."""
+        checked = self._checked_folders[self.current_mode]
+        with QSignalBlocker(self.folder_list):
+            self.folder_list.clear()
+            for name in self._folder_names[self.current_mode]:
+                item = QListWidgetItem(name)
+                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                item.setCheckState(Qt.Checked if name in checked else Qt.Unchecked)
+                self.folder_list.addItem(item)
+    
+    def _set_item_check_states(self, state):
+        """Set every item's check state with the list's signals blocked."""
+        with QSignalBlocker(self.folder_list):
+            for index in range(self.folder_list.count()):
+                self.folder_list.item(index).setCheckState(state)
+    
+    @Slot()
+    def select_all(self):
+        """Select all folders for the current image source."""
+        self._set_item_check_states(Qt.Checked)
+        self._checked_folders[self.current_mode] = set(self._folder_names[self.current_mode])
+        self.on_folder_selection_changed()
+    
+    @Slot()
+    def deselect_all(self):
+        """Deselect all folders for the current image source."""
+        self._set_item_check_states(Qt.Unchecked)
+        self._checked_folders[self.current_mode].clear()
+        self.on_folder_selection_changed()
+    
+    @Slot(QListWidgetItem)
+    def _on_item_changed(self, item):
+        """Record a user's check or uncheck of an item, then report the selection."""
+        checked = self._checked_folders[self.current_mode]
+        name = item.text()
+        is_checked = item.checkState() == Qt.Checked
+        if is_checked == (name in checked):
+            return
+        if is_checked:
+            checked.add(name)
+        else:
+            checked.discard(name)
+        
+        self.on_folder_selection_changed()
     
+    @Slot()
     def on_folder_selection_changed(self):
         """Handle folder selection changes."""
         selected_folders = self.get_selected_folders()
         self.folders_changed.emit(selected_folders)
     
     def get_selected_folders(self):
-        """Get list of currently selected folder names."""
-        selected_folders = []
-        
-        if self.unlabelled_group.isEnabled():
-            # Get selected unlabelled folders
-            for index in range(self.unlabelled_list.count()):
-                item = self.unlabelled_list.item(index)
-                if item.checkState() == Qt.Checked:
-                    selected_folders.append(item.text())
-        else:
-            # Get selected labelled folders
-            for index in range(self.labelled_list.count()):
-                item = self.labelled_list.item(index)
-                if item.checkState() == Qt.Checked:
-                    selected_folders.append(item.text())
-        
-        return selected_folders
+        """Get list of currently selected folder names, in list order."""
+        checked = self._checked_folders[self.current_mode]
+        return [name for name in self._folder_names[self.current_mode] if name in checked]
     
     def get_current_mode(self):
         """Get current viewing mode (unlabelled or labelled)."""
@@ -192,7 +177,5 @@ class FolderManager(QWidget):
     
     def set_viewing_mode(self, mode):
         """Set the viewing mode programmatically."""
-        if mode == "unlabelled" and not self.unlabelled_group.isEnabled():
-            self.toggle_image_source()
-        elif mode == "labelled" and not self.labelled_group.isEnabled():
+        if mode in MODE_TITLES and mode != self.current_mode:
             self.toggle_image_source()
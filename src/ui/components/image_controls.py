@@ -5,7 +5,7 @@ Image controls widget for navigation, threshold, and mask operations.
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                                QLabel, QProgressBar, QDialog, 
                                QCheckBox)
-from PySide6.QtCore import Signal
+from PySide6.QtCore import Signal, Slot
 from core.events import event_bus, EventType
 
 class ImageControls(QWidget):
@@ -22,6 +22,14 @@ class ImageControls(QWidget):
     
     def __init__(self):
         super().__init__()
+        # Crop-all confirmation dialog, built on first use and then reused
+        self._crop_all_dialog = None
+        self._crop_all_overwrite_cb = None
+        # Last state applied to the save indicator, to skip redundant restyles
+        self._save_indicator_state = None
+        # Range last applied to the progress bar; re-applying (0, 0) restarts
+        # the indeterminate animation
+        self._pb_range = None
         self.init_ui()
     
     def init_ui(self):
@@ -102,8 +110,17 @@ class ImageControls(QWidget):
         event_bus.subscribe(EventType.MASK_CREATED, self.on_mask_created)
         event_bus.subscribe(EventType.MASK_CLEARED, self.on_mask_cleared)
     
+    @Slot()
     def show_crop_all_dialog(self):
         """Show confirmation dialog for cropping all images."""
+        if self._crop_all_dialog is None:
+            self._crop_all_dialog = self._build_crop_all_dialog()
+        
+        self._crop_all_overwrite_cb.setChecked(False)
+        self._crop_all_dialog.exec()
+    
+    def _build_crop_all_dialog(self):
+        """Build the crop-all confirmation dialog."""
         dialog = QDialog(self)
         dialog.setWindowTitle("Crop All Images Confirmation")
         layout = QVBoxLayout(dialog)
@@ -113,8 +130,8 @@ class ImageControls(QWidget):
         layout.addWidget(label)
         
         # Overwrite checkbox
-        overwrite_checkbox = QCheckBox("Overwrite existing cropped images")
-        layout.addWidget(overwrite_checkbox)
+        self._crop_all_overwrite_cb = QCheckBox("Overwrite existing cropped images")
+        layout.addWidget(self._crop_all_overwrite_cb)
         
         # Buttons
         button_layout = QHBoxLayout()
@@ -125,16 +142,18 @@ class ImageControls(QWidget):
         layout.addLayout(button_layout)
         
         # Connect buttons
-        ok_button.clicked.connect(lambda: self.start_crop_all(dialog, overwrite_checkbox.isChecked()))
+        ok_button.clicked.connect(
+            lambda: self.start_crop_all(self._crop_all_dialog, self._crop_all_overwrite_cb.isChecked()))
         cancel_button.clicked.connect(dialog.reject)
         
-        dialog.exec()
+        return dialog
     
     def start_crop_all(self, dialog, overwrite):
         """Start the crop all operation."""
         dialog.accept()
         self.all_images_cropped.emit(overwrite)
     
+    @Slot(int, int)
     def update_image_info(self, image_index, pool_size):
         """Update image navigation info."""
         self.index_label.setText(f"Image index: {image_index + 1}, Pool size: {pool_size}")
@@ -161,6 +180,11 @@ class ImageControls(QWidget):
     
     def update_save_indicator(self, is_saved):
         """Update the save indicator based on mask state."""
+        # setStyleSheet re-parses and repolishes even for identical input
+        if is_saved == self._save_indicator_state:
+            return
+        self._save_indicator_state = is_saved
+        
         if is_saved:
             self.save_indicator.setText("●")
             self.save_indicator.setStyleSheet("color: green; font-size: 16px; font-weight: bold;")
@@ -172,6 +196,10 @@ class ImageControls(QWidget):
     
     def show_progress_bar(self, visible=True):
         """Show/hide the progress bar for SAM loading."""
-        self.progress_bar.setVisible(visible)
-        if visible:
-            self.progress_bar.setRange(0, 0)  # Indeterminate progress
\ No newline at end of file
+        # isHidden reflects the bar's own flag, unlike isVisible which also
+        # depends on whether the window is shown
+        if visible and self._pb_range != (0, 0):
+            self.progress_bar.setRange(0, 0)  # Indeterminate progress
+            self._pb_range = (0, 0)
+        if visible == self.progress_bar.isHidden():
+            self.progress_bar.setVisible(visible)
\ No newline at end of file
@@ -3,6 +3,7 @@ Image info widget for displaying current image information.
 """
 
 from PySide6.QtWidgets import QWidget, QHBoxLayout, QGroupBox, QLabel
+from PySide6.QtCore import Slot
 
 class ImageInfo(QWidget):
     """Widget for displaying current image information."""
@@ -29,6 +30,7 @@ class ImageInfo(QWidget):
         layout.addWidget(self.image_info_group)
         self.setLayout(layout)
     
+    @Slot(str)
     def update_image_info(self, filename):
         """Update the displayed image information."""
         if filename:
@@ -4,14 +4,86 @@ Drawing canvas with multi-tool support for mask creation and editing.
 
 from PySide6.QtWidgets import QLabel, QApplication
 from PySide6.QtGui import QPainter, QImage, QPen, QColor, QWheelEvent
-from PySide6.QtCore import Qt, QPoint, QRect, QByteArray, QBuffer, QIODevice, Signal
-from utils.image_processing import threshold_image
+from PySide6.QtCore import Qt, QPoint, QRect, QTimer, Signal
+from utils.image_processing import load_threshold_source, threshold_image_np
+import math
 import numpy as np
 import cv2
 from ui.placeholder_image import create_placeholder_image
 from core.events import event_bus, Event, EventType
 from core.base import ToolType
 
+# Idle time after the last zoom or stroke before the view is rescaled smoothly
+SMOOTH_RESCALE_DELAY_MS = 150
+# Mouse-move repaints are coalesced to at most one per frame (~60 Hz)
+REPAINT_INTERVAL_MS = 16
+
+
+def _qimage_pixels(image, channels=4):
+    """View a QImage's pixels as an (H, W, channels) uint8 array without copying."""
+    height, width = image.height(), image.width()
+    buffer = np.frombuffer(image.constBits(), np.uint8, count=image.sizeInBytes())
+    # Rows may be padded to a 4-byte boundary, so slice each one to its pixel bytes
+    return buffer.reshape(height, image.bytesPerLine())[:, :width * channels].reshape(height, width, channels)
+
+
+def _opaque_image(image):
+    """Return image as Format_RGB32, so drawing it needs no alpha blending."""
+    if image.isNull() or image.format() == QImage.Format_RGB32:
+        return image
+    return image.convertToFormat(QImage.Format_RGB32)
+
+
+def _resize_qimage(image, size, fast=False, out=None):
+    """
+    Resize a QImage with cv2.resize.
+    
+    Args:
+        image (QImage): Source image, in any format
+        size (QSize): Target size
+        fast (bool): Use nearest-neighbour instead of area/bilinear sampling
+        out (np.ndarray): Previous result buffer, reused when its shape matches
+        
+    Returns:
+        tuple: (QImage, np.ndarray) - the scaled image and the array backing it,
+        which must be kept alive for as long as the image is used
+    """
+    # Premultiplied alpha interpolates edges correctly and is Qt's fastest to draw
+    fmt = QImage.Format_ARGB32_Premultiplied if image.hasAlphaChannel() else QImage.Format_RGB32
+    converted = image.convertToFormat(fmt)
+    source = _qimage_pixels(converted)
+    
+    width, height = max(size.width(), 1), max(size.height(), 1)
+    if out is None or out.shape != (height, width, 4):
+        out = np.empty((height, width, 4), dtype=np.uint8)
+    cv2.resize(source, (width, height), dst=out, interpolation=_interpolation(fast, image.width(), width))
+    return QImage(out.data, width, height, width * 4, fmt), out
+
+
+def _interpolation(fast, source_width, target_width):
+    """Pick the cv2 interpolation for a resize: nearest when fast, else area down / linear up."""
+    if fast:
+        return cv2.INTER_NEAREST
+    return cv2.INTER_AREA if target_width < source_width else cv2.INTER_LINEAR
+
+
+def _mask_color_lut(color):
+    """
+    Build a lookup table from mask alpha to a premultiplied ARGB32 pixel of one colour.
+    
+    Args:
+        color (QColor): Display colour of the mask
+        
+    Returns:
+        np.ndarray: (256, 4) uint8 table of B, G, R, A bytes indexed by alpha
+    """
+    alpha = np.arange(256, dtype=np.uint32)
+    lut = np.empty((256, 4), dtype=np.uint8)
+    for channel, value in enumerate((color.blue(), color.green(), color.red())):
+        lut[:, channel] = (alpha * value + 127) // 255
+    lut[:, 3] = alpha
+    return lut
+
 
 class DrawingCanvas(QLabel):
     """
@@ -50,10 +122,52 @@ class DrawingCanvas(QLabel):
         self.penWidth = 25
         self.opacity = 50
         self.scale_factor = 0.18
+        self._inv_scale = 1.0 / self.scale_factor  # Kept in step with scale_factor
         self.min_scale_factor = 0.18  # Will be updated based on image size
         
         # SAM markers
-        self.sam_markers = []  # List of QPoint markers for SAM
+        # SAM markers as an (N, 2) int32 array of image (x, y) coordinates
+        self._markers = np.empty((0, 2), dtype=np.int32)
+        self._marker_pen = QPen(Qt.red, 3, Qt.SolidLine)
+        
+        # Pens built once and only resized when the pen width changes
+        self._brush_pen = QPen(self.penColor, self.penWidth, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+        self._erase_pen = QPen(Qt.transparent, self.penWidth, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+        self._cursor_pen = QPen(Qt.red, 1, Qt.SolidLine)
+        self._crosshair_pen = QPen(Qt.red, 2, Qt.SolidLine)
+        
+        # Painter kept open on the mask for the length of a brush/eraser stroke
+        self._brush_painter = None
+        
+        # 16-bit plane of the image last thresholded, and the file it came from,
+        # so repeated thresholds skip reading and decoding the file again
+        self._threshold_source = None
+        self._threshold_source_path = None
+        
+        # Arrays backing scaled_image/scaled_mask, which wrap them without copying
+        self._scaled_image_pixels = None
+        self._scaled_mask_pixels = None
+        # Masks are single-coloured, so only their alpha is resampled and the
+        # colour is applied afterwards through this table
+        self._mask_lut = _mask_color_lut(QColor(self.penColor))
+        
+        # Interaction state: while the user draws or zooms, scaling uses
+        # FastTransformation and is redone smoothly once input goes idle
+        self._interacting = False
+        self._smooth_pending = False
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.setInterval(SMOOTH_RESCALE_DELAY_MS)
+        self._idle_timer.timeout.connect(self._finalize_smooth)
+        
+        # Mouse moves arrive far faster than the display refreshes, so they
+        # schedule one repaint per frame instead of calling update() each time
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.setInterval(REPAINT_INTERVAL_MS)
+        self._repaint_timer.timeout.connect(self._flush_repaint)
+        # Widget area touched by mouse moves since the last repaint
+        self._pending_dirty = QRect()
         
         # Enable mouse tracking
         self.setMouseTracking(True)
@@ -79,17 +193,19 @@ class DrawingCanvas(QLabel):
         
         # Clear SAM markers when switching away from marker tool
         if self.current_tool != ToolType.MARKER:
-            self.sam_markers.clear()
+            self._reset_markers()
             self.update()
     
     def on_mask_cleared(self, event):
         """Handle mask clear event."""
         self.clearMask()
-        self.sam_markers.clear()
+        self._reset_markers()
     
     def paintEvent(self, event):
         """Paint the canvas."""
         painter = QPainter(self)
+        # Only composite the region Qt asked for, e.g. a stroke or the cursor
+        painter.setClipRect(event.rect())
         
         if not self.scaled_image.isNull():
             # Calculate the drawing rectangle
@@ -103,64 +219,77 @@ class DrawingCanvas(QLabel):
             painter.setOpacity(1.0)  # Reset opacity
             
             # Draw SAM markers
-            self.draw_sam_markers(painter, rect)
+            if len(self._markers):
+                self.draw_sam_markers(painter, rect.x(), rect.y(), self.scale_factor)
         
         # Draw the ghost cursor (only when real image is loaded)
         if self.show_cursor and self.has_real_image:
             if self.current_tool == ToolType.BRUSH:
                 cursor_radius = int(self.penWidth / 2 * self.scale_factor)
-                painter.setPen(QPen(Qt.red, 1, Qt.SolidLine))
+                painter.setPen(self._cursor_pen)
                 painter.drawEllipse(self.current_pos, cursor_radius, cursor_radius)
             elif self.current_tool == ToolType.MARKER:
                 # Draw crosshair for marker tool
-                painter.setPen(QPen(Qt.red, 2, Qt.SolidLine))
+                painter.setPen(self._crosshair_pen)
                 painter.drawLine(self.current_pos.x() - 10, self.current_pos.y(),
                                self.current_pos.x() + 10, self.current_pos.y())
                 painter.drawLine(self.current_pos.x(), self.current_pos.y() - 10,
                                self.current_pos.x(), self.current_pos.y() + 10)
 
-    def draw_sam_markers(self, painter, image_rect):
-        """Draw SAM markers on the canvas."""
-        painter.setPen(QPen(Qt.red, 3, Qt.SolidLine))
-        for i, marker in enumerate(self.sam_markers):
-            # Convert marker position to screen coordinates
-            screen_pos = QPoint(
-                int(marker.x() * self.scale_factor + image_rect.x()),
-                int(marker.y() * self.scale_factor + image_rect.y())
-            )
-            
+    def draw_sam_markers(self, painter, ox, oy, sx):
+        """
+        Draw SAM markers on the canvas.
+        
+        Args:
+            painter (QPainter): Active painter for the canvas
+            ox (int): Screen x of the image origin
+            oy (int): Screen y of the image origin
+            sx (float): Image-to-screen scale factor
+        """
+        painter.setPen(self._marker_pen)
+        # Convert all marker positions to screen coordinates at once
+        screen = (self._markers * sx + (ox, oy)).astype(np.int32).tolist()
+        labels = [str(i + 1) for i in range(len(screen))]
+        draw_ellipse = painter.drawEllipse
+        draw_text = painter.drawText
+        for (x, y), label in zip(screen, labels):
             # Draw marker as a circle with number
-            painter.drawEllipse(screen_pos, 8, 8)
-            painter.drawText(screen_pos.x() - 4, screen_pos.y() + 4, str(i + 1))
+            draw_ellipse(x - 8, y - 8, 16, 16)
+            draw_text(x - 4, y + 4, label)
 
     def mousePressEvent(self, event):
         """Handle mouse press events."""
         # Block all drawing operations if no real image is loaded
         if not self.has_real_image:
             return
+        
+        self._interacting = True
+        self._idle_timer.stop()
             
         if self.current_tool == ToolType.BRUSH:
             if event.button() == Qt.LeftButton:
                 self.drawing = True
                 self.erasing = False
                 self.lastPoint = self.convert_to_image_coords(event.pos())
+                self._begin_stroke(erase=False)
             elif event.button() == Qt.RightButton:
                 self.drawing = False
                 self.erasing = True
                 self.lastPoint = self.convert_to_image_coords(event.pos())
+                self._begin_stroke(erase=True)
         
         elif self.current_tool == ToolType.MARKER:
             if event.button() == Qt.LeftButton:
                 # Add SAM marker
                 image_pos = self.convert_to_image_coords(event.pos())
-                self.sam_markers.append(image_pos)
+                self._markers = np.vstack([self._markers, (image_pos.x(), image_pos.y())]).astype(np.int32, copy=False)
                 self.point_clicked.emit(image_pos)
                 self.update()
                 
                 # Publish event for SAM processing
                 event_bus.publish(Event(
                     event_type=EventType.SAM_MARKER_ADDED,
-                    data={"point": image_pos, "markers": self.sam_markers},
+                    data={"point": image_pos, "markers": self.get_sam_marker_array()},
                     source="canvas"
                 ))
             elif event.button() == Qt.RightButton:
@@ -175,58 +304,117 @@ class DrawingCanvas(QLabel):
 
     def mouseMoveEvent(self, event):
         """Handle mouse move events."""
+        # The cursor must be erased where it was and drawn where it is now
+        dirty = self._cursor_rect(self.current_pos) if self.show_cursor else QRect()
         self.current_pos = event.pos()
         self.show_cursor = True
+        dirty = dirty.united(self._cursor_rect(self.current_pos))
         
         if self.current_tool == ToolType.BRUSH and not self.mask.isNull() and self.has_real_image:
-            if (event.buttons() & Qt.LeftButton) and self.drawing:
+            drawing = (event.buttons() & Qt.LeftButton) and self.drawing
+            erasing = (event.buttons() & Qt.RightButton) and self.erasing
+            if drawing or erasing:
                 current_point = self.convert_to_image_coords(event.pos())
-                painter = QPainter(self.mask)
-                if painter.isActive():
-                    painter.setPen(QPen(self.penColor, self.penWidth, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
-                    painter.drawLine(self.lastPoint, current_point)
-                    painter.end()
+                if self._brush_painter is None:
+                    # The mask was replaced mid-stroke; continue on the new one
+                    self._begin_stroke(erase=bool(erasing))
+                if self._brush_painter is not None:
+                    self._brush_painter.drawLine(self.lastPoint, current_point)
+                self.update_scaled_mask_region(self.lastPoint, current_point)
+                dirty = dirty.united(self._stroke_widget_rect(self.lastPoint, current_point))
                 self.lastPoint = current_point
-                self.update_scaled_image()
-                self.mask_changed.emit()
-            elif (event.buttons() & Qt.RightButton) and self.erasing:
-                current_point = self.convert_to_image_coords(event.pos())
-                painter = QPainter(self.mask)
-                if painter.isActive():
-                    painter.setCompositionMode(QPainter.CompositionMode_Clear)
-                    painter.setPen(QPen(Qt.transparent, self.penWidth, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
-                    painter.drawLine(self.lastPoint, current_point)
-                    painter.end()
-                self.lastPoint = current_point
-                self.update_scaled_image()
                 self.mask_changed.emit()
         
         if self.panning:
-            delta = event.pos() - self.panStart
-            self.panOffset += delta
+            previous_offset = QPoint(self.panOffset)
+            self.panOffset += event.pos() - self.panStart
             self.panStart = event.pos()
             self.adjust_pan_offset()
-        
-        self.update()  # Always update to show the cursor
+            moved = self.panOffset - previous_offset
+            if not moved.isNull():
+                # Hand Qt any queued area first so it is shifted with the scroll
+                if not self._pending_dirty.isEmpty():
+                    self.update(self._pending_dirty)
+                    self._pending_dirty = QRect()
+                # Blit what is already on screen; Qt repaints only the exposed strip
+                self.scroll(moved.x(), moved.y())
+                # The old cursor was carried along by the scroll; clear it there too
+                dirty = dirty.united(dirty.translated(moved))
+        
+        # Always repaint to show the cursor, at most once per frame
+        self._pending_dirty = self._pending_dirty.united(dirty)
+        if not self._repaint_timer.isActive():
+            self._repaint_timer.start()
+    
+    def _flush_repaint(self):
+        """Repaint the area accumulated by mouse moves since the last frame."""
+        dirty, self._pending_dirty = self._pending_dirty, QRect()
+        if not dirty.isEmpty():
+            self.update(dirty)
+    
+    def _cursor_rect(self, pos):
+        """Widget-space bounds of the ghost cursor or crosshair drawn at pos."""
+        # Crosshair arms are 10px; the brush circle follows the pen width
+        radius = max(int(self.penWidth / 2 * self.scale_factor), 10) + 3
+        return QRect(pos.x() - radius, pos.y() - radius, 2 * radius + 1, 2 * radius + 1)
+    
+    def _stroke_widget_rect(self, start, end):
+        """Widget-space bounds of a brush segment between two image points."""
+        scale = self.scale_factor
+        offset_x, offset_y = self.panOffset.x(), self.panOffset.y()
+        rect = QRect(
+            QPoint(int(start.x() * scale + offset_x), int(start.y() * scale + offset_y)),
+            QPoint(int(end.x() * scale + offset_x), int(end.y() * scale + offset_y)),
+        ).normalized()
+        margin = int(self.penWidth * scale / 2) + 3
+        return rect.adjusted(-margin, -margin, margin, margin)
 
     def mouseReleaseEvent(self, event):
         """Handle mouse release events."""
         if event.button() == Qt.LeftButton:
             self.drawing = False
+            self._end_stroke()
         elif event.button() == Qt.RightButton:
             self.erasing = False
+            self._end_stroke()
         elif event.button() == Qt.MiddleButton:
             self.panning = False
+        
+        if self._interacting and event.buttons() == Qt.NoButton:
+            self._idle_timer.start()
+
+    def _begin_stroke(self, erase):
+        """Open the painter used for the rest of a brush or eraser stroke."""
+        self._end_stroke()
+        if self.mask.isNull():
+            return
+        painter = QPainter(self.mask)
+        if not painter.isActive():
+            return
+        if erase:
+            painter.setCompositionMode(QPainter.CompositionMode_Clear)
+            painter.setPen(self._erase_pen)
+        else:
+            painter.setPen(self._brush_pen)
+        self._brush_painter = painter
+    
+    def _end_stroke(self):
+        """Close the stroke painter, if one is open."""
+        if self._brush_painter is not None:
+            self._brush_painter.end()
+            self._brush_painter = None
 
     def leaveEvent(self, event):
         """Handle mouse leave events."""
-        self.show_cursor = False
-        self.update()
+        if self.show_cursor:
+            self.show_cursor = False
+            self.update()
 
     def enterEvent(self, event):
         """Handle mouse enter events."""
-        self.show_cursor = True
-        self.update()
+        if not self.show_cursor:
+            self.show_cursor = True
+            self.update()
 
     def wheelEvent(self, event: QWheelEvent):
         """Handle wheel events for zooming toward cursor position."""
@@ -239,35 +427,37 @@ class DrawingCanvas(QLabel):
         # Convert mouse position to image coordinates before scaling
         image_pos_before = self.convert_to_image_coords(mouse_pos)
         
-        # Apply zoom
+        # Work out the new zoom before touching any scaled buffers
         if event.angleDelta().y() > 0:
-            self.scale_factor *= 1.1
+            new_scale = self.scale_factor * 1.1
         else:
-            self.scale_factor /= 1.1
+            new_scale = self.scale_factor / 1.1
         
         # Prevent zooming out beyond the minimum scale (80% canvas coverage)
-        if self.scale_factor < self.min_scale_factor:
-            self.scale_factor = self.min_scale_factor
+        new_scale = max(new_scale, self.min_scale_factor)
         
-        # Update the scaled image with new scale
-        self.update_scaled_image()
-        
-        # Calculate where the same image point would be after scaling
+        # Calculate where the same image point will be after scaling
         new_widget_pos = QPoint(
-            int(image_pos_before.x() * self.scale_factor + self.panOffset.x()),
-            int(image_pos_before.y() * self.scale_factor + self.panOffset.y())
+            int(image_pos_before.x() * new_scale + self.panOffset.x()),
+            int(image_pos_before.y() * new_scale + self.panOffset.y())
         )
         
         # Adjust pan offset to keep the mouse cursor over the same image point
+        self.scale_factor = new_scale
+        self._inv_scale = 1.0 / new_scale
         self.panOffset += mouse_pos - new_widget_pos
         
-        # Ensure pan offset stays within bounds
-        self.adjust_pan_offset()
-        self.update()
+        # Rescale once, which also clamps the pan offset and repaints;
+        # redone smoothly once the wheel stops
+        self._interacting = True
+        self.update_scaled_image(fast=True)
+        self._idle_timer.start()
 
     def loadImage(self, filePath):
         """Load an image."""
+        self._release_threshold_source()
         self.image.load(filePath)
+        self.image = _opaque_image(self.image)
         if not self.image.isNull():
             # Mark that we have a real image loaded
             self.has_real_image = True
@@ -282,6 +472,7 @@ class DrawingCanvas(QLabel):
         
     def loadMask(self, filePath):
         """Load a mask."""
+        self._end_stroke()
         self.mask.load(filePath)
         if not self.mask.isNull():
             self.update_scaled_image()
@@ -289,14 +480,25 @@ class DrawingCanvas(QLabel):
             
     def applyThreshold(self, threshold_value, filepath):
         """Apply threshold to create mask."""
-        self.mask = threshold_image(filepath, threshold_value)
+        self._end_stroke()
+        if filepath != self._threshold_source_path:
+            self._threshold_source = load_threshold_source(filepath)
+            self._threshold_source_path = filepath
+        # The thresholded image wraps a shared scratch buffer, so copy it in
+        self._copy_into_mask(threshold_image_np(self._threshold_source, threshold_value))
         self.update_scaled_image()
         self.update()
         self.mask_changed.emit()
             
+    def _release_threshold_source(self):
+        """Drop the cached threshold plane once a different image is shown."""
+        self._threshold_source = None
+        self._threshold_source_path = None
+            
     def displayPlaceholder(self, message_type="default"):
         """Display placeholder image."""
-        self.image = create_placeholder_image(500, 500, message_type)
+        self._release_threshold_source()
+        self.image = _opaque_image(create_placeholder_image(500, 500, message_type))
         # Mark that this is a placeholder, not a real image
         self.has_real_image = False
         self.clearMask()
@@ -305,12 +507,17 @@ class DrawingCanvas(QLabel):
             
     def clearMask(self):
         """Clear the current mask."""
+        self._end_stroke()
         if not self.image.isNull():
-            self.mask = QImage(self.image.size(), QImage.Format_ARGB32)
-            self.mask.fill(Qt.transparent)
+            # Reuse the existing buffer when it already fits the image
+            if self.mask.size() != self.image.size() or self.mask.format() != QImage.Format_ARGB32:
+                self.mask = QImage(self.image.size(), QImage.Format_ARGB32)
+            # Transparent is all-zero in ARGB32, so clear the buffer with a
+            # plain memset instead of Qt's per-pixel fill
+            np.frombuffer(self.mask.bits(), dtype=np.uint8, count=self.mask.sizeInBytes()).fill(0)
         else:
             self.mask = QImage()
-        self.sam_markers.clear()
+        self._reset_markers()
         self.update_scaled_image()
         self.update()
         self.mask_changed.emit()
@@ -328,57 +535,150 @@ class DrawingCanvas(QLabel):
             self.update_scaled_image()
             self.center_image()
 
-    def update_scaled_image(self):
-        """Update scaled versions of image and mask."""
+    def update_scaled_image(self, fast=False):
+        """
+        Update scaled versions of image and mask.
+        
+        Args:
+            fast (bool): Use nearest-neighbour scaling, for live interaction
+        """
         if not self.image.isNull():
-            size = self.image.size() * self.scale_factor
-            self.scaled_image = self.image.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.scaled_mask = self.mask.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            transform = Qt.FastTransformation if fast else Qt.SmoothTransformation
+            self.update_scaled_image_only(transform)
+            self.update_scaled_mask_only(transform)
+            if fast:
+                self._smooth_pending = True
         self.adjust_pan_offset()
         self.update()
+    
+    def update_scaled_image_only(self, transform=Qt.SmoothTransformation):
+        """Rescale the image to the current zoom, leaving the mask as is."""
+        size = self.image.size().scaled(self.image.size() * self.scale_factor, Qt.KeepAspectRatio)
+        self.scaled_image, self._scaled_image_pixels = _resize_qimage(
+            self.image, size, transform == Qt.FastTransformation, self._scaled_image_pixels)
+    
+    def update_scaled_mask_only(self, transform=Qt.SmoothTransformation):
+        """Rescale the whole mask to the current zoom, leaving the image as is."""
+        if self.mask.isNull():
+            self.scaled_mask = QImage()
+            return
+        size = self.mask.size().scaled(self.image.size() * self.scale_factor, Qt.KeepAspectRatio)
+        width, height = max(size.width(), 1), max(size.height(), 1)
+        
+        # Resample the 8-bit alpha plane only, then colour it in one table lookup
+        alpha_image = self.mask.convertToFormat(QImage.Format_Alpha8)
+        alpha = _qimage_pixels(alpha_image, 1)[..., 0]
+        interpolation = _interpolation(transform == Qt.FastTransformation, self.mask.width(), width)
+        scaled_alpha = cv2.resize(alpha, (width, height), interpolation=interpolation)
+        
+        # Colour into the previous buffer when the target size is unchanged
+        out = self._scaled_mask_pixels
+        if out is None or out.shape != (height, width, 4):
+            out = np.empty((height, width, 4), dtype=np.uint8)
+        np.take(self._mask_lut, scaled_alpha, axis=0, out=out)
+        self._scaled_mask_pixels = out
+        self.scaled_mask = QImage(out.data, width, height, width * 4, QImage.Format_ARGB32_Premultiplied)
+    
+    def _finalize_smooth(self):
+        """Redo fast interactive scaling smoothly once input has gone idle."""
+        if QApplication.mouseButtons() != Qt.NoButton:
+            # Still mid-drag; the button release restarts the timer
+            return
+        self._interacting = False
+        if self._smooth_pending:
+            self._smooth_pending = False
+            self.update_scaled_image()
+    
+    def update_scaled_mask_region(self, start, end):
+        """
+        Rescale only the part of the mask touched by a brush segment.
+        
+        Args:
+            start (QPoint): Segment start in image coordinates
+            end (QPoint): Segment end in image coordinates
+        """
+        if self.scaled_mask.isNull() or self.mask.size() != self.image.size():
+            self.update_scaled_mask_only()
+            return
+        
+        # Segment bounds grown by the pen radius, plus a pixel for smoothing
+        margin = self.penWidth // 2 + 2
+        dirty = QRect(start, end).normalized().adjusted(-margin, -margin, margin, margin)
+        dirty = dirty.intersected(self.mask.rect())
+        if dirty.isEmpty():
+            return
+        
+        # Matching rectangle in the scaled mask, rounded outwards
+        scaled_width, scaled_height = self.scaled_mask.width(), self.scaled_mask.height()
+        scale_x = scaled_width / self.mask.width()
+        scale_y = scaled_height / self.mask.height()
+        left = math.floor(dirty.left() * scale_x)
+        top = math.floor(dirty.top() * scale_y)
+        right = min(max(math.ceil((dirty.right() + 1) * scale_x), left + 1), scaled_width)
+        bottom = min(max(math.ceil((dirty.bottom() + 1) * scale_y), top + 1), scaled_height)
+        
+        fast = self._interacting
+        if fast:
+            self._smooth_pending = True
+        
+        # Same alpha resample and colour lookup as update_scaled_mask_only, so a
+        # stroked region matches a full rescale; writing into the backing array
+        # replaces the region outright, so erased pixels become transparent
+        alpha_image = self.mask.copy(dirty).convertToFormat(QImage.Format_Alpha8)
+        alpha = _qimage_pixels(alpha_image, 1)[..., 0]
+        interpolation = _interpolation(fast, dirty.width(), right - left)
+        scaled_alpha = cv2.resize(alpha, (right - left, bottom - top), interpolation=interpolation)
+        np.take(self._mask_lut, scaled_alpha, axis=0, out=self._scaled_mask_pixels[top:bottom, left:right])
 
     def convert_to_image_coords(self, pos):
         """Convert screen coordinates to image coordinates."""
-        x = (pos.x() - self.panOffset.x()) / self.scale_factor
-        y = (pos.y() - self.panOffset.y()) / self.scale_factor
-        return QPoint(int(x), int(y))
+        offset = self.panOffset
+        inv_scale = self._inv_scale
+        return QPoint(int((pos.x() - offset.x()) * inv_scale), int((pos.y() - offset.y()) * inv_scale))
 
     def set_opacity(self, value):
         """Set mask opacity."""
+        if value == self.opacity:
+            return
         self.opacity = value
         self.update()
         
     def set_penWidth(self, value):
         """Set pen width."""
+        if value == self.penWidth:
+            return
         self.penWidth = value
+        self._brush_pen.setWidth(value)
+        self._erase_pen.setWidth(value)
         self.update()
 
     def set_image(self, image):
         """Set the image."""
-        self.image = image
+        self.image = _opaque_image(image)
         self.update()
 
     def QImageToCvMat(self, incomingImage):
         """Convert QImage to OpenCV Mat format."""
-        ba = QByteArray()
-        buff = QBuffer(ba)
-        buff.open(QIODevice.ReadWrite)
-        incomingImage.save(buff, "PNG")
-        fBytes = np.asarray(bytearray(ba.data()), dtype=np.uint8)
-        return cv2.imdecode(fBytes, cv2.IMREAD_COLOR)
+        # Read the pixels straight out of a BGR888 copy; the view is copied
+        # because the converted QImage is freed on return
+        image = incomingImage.convertToFormat(QImage.Format_BGR888)
+        return _qimage_pixels(image, 3).copy()
 
     def crop_by_mask(self):
         """Crop image by mask."""
         if self.image.isNull() or self.mask.isNull():
             return
         
-        cropped_image = self.image.copy()
+        image = self.image.convertToFormat(QImage.Format_RGBA8888)
+        mask = self.mask.convertToFormat(QImage.Format_ARGB32)
         
-        for y in range(self.image.height()):
-            for x in range(self.image.width()):
-                if self.mask.pixelColor(x, y).alpha() == 0:
-                    cropped_image.setPixelColor(x, y, QColor(Qt.white))
+        # Whiten every pixel outside the mask in one vectorized store; ARGB32
+        # is stored B, G, R, A on little-endian hosts, so alpha is channel 3
+        pixels = _qimage_pixels(image).copy()
+        pixels[_qimage_pixels(mask)[..., 3] == 0] = 255
         
+        height, width = pixels.shape[:2]
+        cropped_image = QImage(pixels.data, width, height, width * 4, QImage.Format_RGBA8888)
         cropped_np = self.QImageToCvMat(cropped_image)
         return cropped_np
 
@@ -386,9 +686,23 @@ class DrawingCanvas(QLabel):
         """Get the current mask."""
         return self.mask
 
+    def _copy_into_mask(self, mask):
+        """Make the mask a copy of the given image, reusing the current buffer when it fits."""
+        if self.mask.size() == mask.size() and self.mask.format() == mask.format():
+            # Copy into the current buffer; bits() detaches it first if it is shared
+            target = np.frombuffer(self.mask.bits(), np.uint8, count=self.mask.sizeInBytes())
+            target[:] = np.frombuffer(mask.constBits(), np.uint8, count=mask.sizeInBytes())
+        else:
+            self.mask = mask.copy()
+    
     def set_mask(self, mask):
-        """Set the mask."""
-        self.mask = mask
+        """
+        Set the mask.
+        
+        The pixels are copied, so mask may wrap a buffer the caller goes on to reuse.
+        """
+        self._end_stroke()
+        self._copy_into_mask(mask)
         self.update_scaled_image()
         self.update()
         self.mask_changed.emit()
@@ -396,7 +710,7 @@ class DrawingCanvas(QLabel):
         # Publish mask created event
         event_bus.publish(Event(
             event_type=EventType.MASK_CREATED,
-            data={"mask": mask},
+            data={"mask": self.mask},
             source="canvas"
         ))
 
@@ -418,6 +732,7 @@ class DrawingCanvas(QLabel):
         
         # Set this as the initial scale
         self.scale_factor = fit_scale
+        self._inv_scale = 1.0 / fit_scale
         
         # Calculate minimum scale for 80% canvas coverage
         coverage_target = 0.8
@@ -445,7 +760,15 @@ class DrawingCanvas(QLabel):
     
     def get_sam_markers(self):
         """Get list of SAM markers in image coordinates."""
-        return self.sam_markers.copy()
+        return [QPoint(x, y) for x, y in self._markers.tolist()]
+    
+    def get_sam_marker_array(self):
+        """Get a copy of the SAM markers as an (N, 2) int32 array of image coordinates."""
+        return self._markers.copy()
+    
+    def _reset_markers(self):
+        """Drop all SAM markers without repainting."""
+        self._markers = np.empty((0, 2), dtype=np.int32)
     
     def remove_nearest_marker(self, position, threshold=20):
         """
@@ -455,34 +778,30 @@ class DrawingCanvas(QLabel):
             position (QPoint): Position to check for nearest marker
             threshold (int): Maximum distance in pixels to consider for removal
         """
-        if not self.sam_markers:
+        if not len(self._markers):
             return
         
-        nearest_index = -1
-        min_distance = float('inf')
-        
-        # Find the nearest marker
-        for i, marker in enumerate(self.sam_markers):
-            distance = ((marker.x() - position.x()) ** 2 + (marker.y() - position.y()) ** 2) ** 0.5
-            if distance < min_distance and distance <= threshold:
-                min_distance = distance
-                nearest_index = i
+        # Squared distances to every marker; no square root needed against threshold²
+        offsets = self._markers - (position.x(), position.y())
+        distances_sq = (offsets * offsets).sum(axis=1)
+        nearest_index = int(distances_sq.argmin())
         
         # Remove the nearest marker if found
-        if nearest_index >= 0:
-            removed_marker = self.sam_markers.pop(nearest_index)
-
+        if distances_sq[nearest_index] <= threshold * threshold:
+            x, y = self._markers[nearest_index].tolist()
+            removed_marker = QPoint(x, y)
+            self._markers = np.delete(self._markers, nearest_index, axis=0)
             
             # Publish event for marker removal
             event_bus.publish(Event(
                 event_type=EventType.SAM_MARKER_REMOVED,
-                data={"removed_point": removed_marker, "markers": self.sam_markers},
+                data={"removed_point": removed_marker, "markers": self.get_sam_marker_array()},
                 source="canvas"
             ))
     
     def clear_sam_markers(self):
         """Clear all SAM markers."""
-        self.sam_markers.clear()
+        self._reset_markers()
         self.update()
     
     def has_image_loaded(self):
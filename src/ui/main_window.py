@@ -13,6 +13,7 @@ The main window integrates:
 - Mask saving and export functionality
 """
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QMessageBox, QSizePolicy)
+from PySide6.QtCore import QObject, QPoint, QRunnable, QThreadPool, QTimer, Signal, Slot
 from PySide6.QtGui import QImage
 import numpy as np
 from ui.drawing_canvas import DrawingCanvas
@@ -25,6 +26,39 @@ from services.model_service import ModelService
 from services.auto_sam_service import AutoSamService
 from utils.logging_config import get_logger
 from core.events import event_bus, EventType
+from core.base import SaveState
+
+# Coalescing window for mask-modified UI updates and marker-removal re-segmentation
+MASK_MODIFIED_DELAY_MS = 33
+SAM_MARKER_REMOVAL_DELAY_MS = 33
+
+# RGBA pixel for SAM mask values 0 (transparent) and 1 (blue)
+_SAM_LUT = np.array([[0, 0, 0, 0], [0, 0, 255, 255]], dtype=np.uint8)
+
+
+class _SamPreloadSignals(QObject):
+    """Signals for reporting the end of a background SAM preload."""
+    
+    finished = Signal(bool, str)  # Success, error message
+
+
+class _SamPreloadTask(QRunnable):
+    """Thread pool task that loads the SAM weights off the GUI thread."""
+    
+    def __init__(self, model_service, signals):
+        super().__init__()
+        self.model_service = model_service
+        self.signals = signals
+    
+    def run(self):
+        try:
+            success, error = self.model_service.load_sam(), ""
+            if success:
+                self.model_service.warmup()
+        except Exception as e:
+            success, error = False, str(e)
+        # Delivered to GUI-thread slots as a queued call
+        self.signals.finished.emit(success, error)
 
 
 class MainWindow(QMainWindow):
@@ -46,10 +80,30 @@ class MainWindow(QMainWindow):
         # SAM state
         self.sam_loaded = False
         self.current_sam_image = None
-        
-        # Track mask save state
-        self.mask_is_saved = True
-        self.current_mask_modified = False
+        # Set once the background preload has finished; SAM requests made
+        # before then are held here (latest only) and replayed afterwards,
+        # unless another image has been loaded in the meantime
+        self._sam_ready = False
+        self._pending_sam_request = None
+        self._sam_preload_signals = _SamPreloadSignals()
+        self._sam_preload_signals.finished.connect(self.on_sam_preloaded)
+        # Reused pixel buffer behind the SAM mask QImage, which wraps it without copying
+        self._mask_scratch = None
+        
+        # Track mask save state; None until the first state is pushed to the indicator
+        self._save_state = None
+        
+        # The save indicator follows a change to dirty at most once per interval
+        self._modified_timer = QTimer(self)
+        self._modified_timer.setSingleShot(True)
+        self._modified_timer.setInterval(MASK_MODIFIED_DELAY_MS)
+        self._modified_timer.timeout.connect(self._flush_modified)
+        
+        # Marker removals re-run SAM once, with whatever markers remain last
+        self._marker_removal_timer = QTimer(self)
+        self._marker_removal_timer.setSingleShot(True)
+        self._marker_removal_timer.setInterval(SAM_MARKER_REMOVAL_DELAY_MS)
+        self._marker_removal_timer.timeout.connect(self._flush_marker_removal)
         
         # Initialize UI components
         self.init_components()
@@ -60,8 +114,9 @@ class MainWindow(QMainWindow):
         # Initialize state
         self.initialize_application_state()
         
-        # Preload SAM model to avoid freeze on first use
-        self.preload_sam_model()
+        # Preload SAM model in the background to avoid a freeze on first use,
+        # once the event loop is running so the window is shown first
+        QTimer.singleShot(0, self.preload_sam_model)
 
     def init_components(self):
         """Initialize all UI components."""
@@ -109,7 +164,7 @@ class MainWindow(QMainWindow):
         
         # Folder manager connections
         self.folder_manager.folders_changed.connect(self.on_folders_changed)
-        self.folder_manager.image_source_toggled.connect(self.on_image_source_toggled)
+        self.folder_manager.mode_and_folders_changed.connect(self.on_mode_and_folders_changed)
         
         # Image controls connections
         self.image_controls.random_image_requested.connect(self.get_random_image)
@@ -129,6 +184,9 @@ class MainWindow(QMainWindow):
         # Canvas connections
         self.canvas.mask_changed.connect(self.on_mask_modified)
         self.canvas.point_clicked.connect(self.on_sam_marker_placed)
+        
+        # Auto SAM results arrive asynchronously from a worker thread
+        self.auto_sam_service.auto_mask_generated.connect(self.on_auto_mask_generated)
 
     def connect_events(self):
         """Connect to application events."""
@@ -153,31 +211,45 @@ class MainWindow(QMainWindow):
         
         self.update_gui_no_image()
     
+    @Slot()
     def preload_sam_model(self):
-        """Preload SAM model at startup to avoid freeze on first use."""
-        try:
-            success = self.model_service.load_sam()
-            if not success:
-                self.logger.error("SAM model could not be loaded. SAM functionality will be disabled.")
-                QMessageBox.warning(
-                    self, 
-                    "SAM Model Warning", 
-                    "SAM model could not be loaded. SAM functionality will be disabled."
-                )
-        except Exception as e:
-            self.logger.error(f"Error loading SAM model: {e}", exc_info=True)
+        """Start loading the SAM model on a worker thread to avoid a freeze on first use."""
+        self.image_controls.show_progress_bar(True)
+        QThreadPool.globalInstance().start(_SamPreloadTask(self.model_service, self._sam_preload_signals))
+    
+    @Slot(bool, str)
+    def on_sam_preloaded(self, success, error):
+        """Handle the end of the background SAM preload and replay any held request."""
+        self._sam_ready = True
+        self.image_controls.show_progress_bar(False)
+        
+        if error:
+            self.logger.error(f"Error loading SAM model: {error}")
             QMessageBox.warning(
                 self, 
                 "SAM Model Error", 
-                f"Error loading SAM model: {str(e)}"
+                f"Error loading SAM model: {error}"
             )
+        elif not success:
+            self.logger.error("SAM model could not be loaded. SAM functionality will be disabled.")
+            QMessageBox.warning(
+                self, 
+                "SAM Model Warning", 
+                "SAM model could not be loaded. SAM functionality will be disabled."
+            )
+        
+        request, self._pending_sam_request = self._pending_sam_request, None
+        if request is not None:
+            request()
 
+    @Slot(object)
     def on_experiment_changed(self, experiment):
         """Handle experiment change."""
         self.folder_manager.load_unlabelled_folders(experiment)
         self.folder_manager.load_labelled_folders(experiment)
         self.update_canvas_state()
 
+    @Slot(list)
     def on_folders_changed(self, selected_folders):
         """Handle folder selection changes."""
         self.image_manager.set_selected_folders(selected_folders)
@@ -188,9 +260,11 @@ class MainWindow(QMainWindow):
         
         self.update_canvas_state()
 
-    def on_image_source_toggled(self, mode):
-        """Handle image source toggle."""
-        self.image_manager.set_viewing_mode(mode)
+    @Slot(str, list)
+    def on_mode_and_folders_changed(self, mode, selected_folders):
+        """Handle image source toggle, which also switches the folder selection."""
+        self.image_manager.set_viewing_mode_and_folders(mode, selected_folders)
+        self.image_controls.set_crop_all_enabled(len(selected_folders) > 0)
         self.update_canvas_state()
 
     def on_folder_refresh_requested(self, event):
@@ -211,6 +285,7 @@ class MainWindow(QMainWindow):
         else:
             self.load_image_path(None, None)
 
+    @Slot()
     def get_random_image(self):
         """Load a random image."""
         file_path = self.image_manager.get_random_image()
@@ -220,6 +295,7 @@ class MainWindow(QMainWindow):
         else:
             self.load_image_path(None, None)
 
+    @Slot()
     def get_next_image(self):
         """Load next image."""
         file_path = self.image_manager.get_next_image()
@@ -227,6 +303,7 @@ class MainWindow(QMainWindow):
             mask_path = self.image_manager.get_image_mask()
             self.load_image_path(file_path, mask_path)
 
+    @Slot()
     def get_previous_image(self):
         """Load previous image."""
         file_path = self.image_manager.get_previous_image()
@@ -236,17 +313,18 @@ class MainWindow(QMainWindow):
 
     def load_image_path(self, file_path, mask_path):
         """Load image and mask to canvas."""
+        # Markers removed on, or SAM requests held for, the previous image must
+        # not segment this one
+        self._marker_removal_timer.stop()
+        self._pending_sam_request = None
         if file_path:
             self.update_gui_image()
             self.canvas.loadImage(file_path)
             if mask_path:
                 self.canvas.loadMask(mask_path)
-                self.mask_is_saved = True
             else:
                 self.canvas.clearMask()
-                self.mask_is_saved = True
-            self.current_mask_modified = False
-            self.image_controls.update_save_indicator(self.mask_is_saved)
+            self._set_save_state(SaveState.SAVED)
             
             # Reset SAM state for new image (will be loaded on demand)
             self.sam_loaded = False
@@ -258,6 +336,7 @@ class MainWindow(QMainWindow):
         else:
             self.update_gui_no_image()
 
+    @Slot(int)
     def apply_threshold(self, threshold_value):
         """Apply thresholding to generate mask."""
         current_path = self.image_manager.get_current_image_path()
@@ -265,14 +344,14 @@ class MainWindow(QMainWindow):
             self.canvas.applyThreshold(threshold_value, current_path)
             self.on_mask_modified()
 
+    @Slot()
     def save_mask(self):
         """Save current mask."""
         mask = self.canvas.get_mask()
         if self.image_manager.save_mask(mask):
-            self.mask_is_saved = True
-            self.current_mask_modified = False
-            self.image_controls.update_save_indicator(self.mask_is_saved)
+            self._set_save_state(SaveState.SAVED)
     
+    @Slot()
     def save_and_get_next(self):
         """Save current mask and get a random image."""
         # First save the mask
@@ -280,12 +359,14 @@ class MainWindow(QMainWindow):
         # Then get a random image
         self.get_random_image()
 
+    @Slot()
     def crop_by_mask(self):
         """Crop current image by mask."""
         cropped_np = self.canvas.crop_by_mask()
         if cropped_np is not None:
             self.image_manager.save_cropped_image(cropped_np)
 
+    @Slot(bool)
     def crop_all_images(self, overwrite):
         """Crop all images by their masks."""
         if not self.image_manager.current_experiment or not self.image_manager.selected_folders:
@@ -299,12 +380,18 @@ class MainWindow(QMainWindow):
             self.logger.error(f"Error cropping images: {e}", exc_info=True)
             QMessageBox.critical(self, "Error", f"Error cropping images: {str(e)}")
 
+    @Slot(QPoint)
     def on_sam_marker_placed(self, point):
         """Handle SAM marker placement."""
         current_path = self.image_manager.get_current_image_path()
         if not current_path:
             return
         
+        if not self._sam_ready:
+            # Still loading in the background; segment once it is ready
+            self._pending_sam_request = lambda: self.on_sam_marker_placed(point)
+            return
+        
         # Load SAM on demand when marker is placed
         if not self.sam_loaded or self.current_sam_image != current_path:
             if not self.load_sam_for_current_image():
@@ -358,19 +445,21 @@ class MainWindow(QMainWindow):
     def apply_sam_with_point(self, point):
         """Apply SAM segmentation with a point marker."""
         # Get all current markers from canvas
-        markers = self.canvas.get_sam_markers()
+        markers = self.canvas.get_sam_marker_array()
         self.apply_sam_with_markers(markers)
     
     def apply_sam_with_markers(self, markers):
-        """Apply SAM segmentation with a list of markers."""
+        """Apply SAM segmentation with an (N, 2) array of marker coordinates."""
+        # This run supersedes any removal still waiting to re-segment
+        self._marker_removal_timer.stop()
         try:
-            if not markers:
+            if not len(markers):
                 self.logger.error("No markers provided for SAM segmentation")
                 return
             
-            sam_points = np.array([[p.x(), p.y()] for p in markers])
-            
-            mask = self.model_service.add_predictor_point(sam_points)
+            # Every canvas marker is a foreground point
+            labels = np.ones(len(markers), dtype=np.int32)
+            mask = self.model_service.add_predictor_point(markers, labels)
             
             if mask is not None:
                 mask_qimage = self.convert_sam_mask_to_qimage(mask)
@@ -382,13 +471,21 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "SAM Error", f"Could not apply SAM segmentation: {str(e)}")
 
     def convert_sam_mask_to_qimage(self, mask):
-        """Convert SAM mask (numpy array) to QImage."""
+        """
+        Convert SAM mask (numpy array) to QImage.
+        
+        The QImage wraps a scratch buffer that the next call overwrites, so it
+        is only valid until then; DrawingCanvas.set_mask copies what it keeps.
+        """
         height, width = mask.shape
-        mask_image = np.zeros((height, width, 4), dtype=np.uint8)
-        mask_image[mask == 1] = [0, 0, 255, 255]  # Blue mask where SAM detected
+        if self._mask_scratch is None or self._mask_scratch.shape != (height, width, 4):
+            self._mask_scratch = np.empty((height, width, 4), dtype=np.uint8)
+        
+        # One gather through the two-entry table fills the contiguous (H, W, 4) image
+        indices = mask.view(np.uint8) if mask.dtype in (np.bool_, np.uint8) else (mask == 1).view(np.uint8)
+        np.take(_SAM_LUT, indices, axis=0, out=self._mask_scratch)
         
-        qimage = QImage(mask_image.data, width, height, mask_image.strides[0], QImage.Format_RGBA8888)
-        return qimage
+        return QImage(self._mask_scratch.data, width, height, width * 4, QImage.Format_RGBA8888)
 
     def on_mask_created(self, event):
         """Handle mask creation event."""
@@ -399,11 +496,25 @@ class MainWindow(QMainWindow):
         self.on_mask_modified()
         self.update_gui_image()
 
+    @Slot()
     def on_mask_modified(self):
         """Handle mask modification."""
-        self.current_mask_modified = True
-        self.mask_is_saved = False
-        self.image_controls.update_save_indicator(self.mask_is_saved)
+        self._set_save_state(SaveState.DIRTY)
+    
+    def _set_save_state(self, state):
+        """Record the mask's save state, touching the indicator only on a change."""
+        if state == self._save_state:
+            return
+        self._save_state = state
+        if state == SaveState.SAVED:
+            self.image_controls.update_save_indicator(True)
+        elif not self._modified_timer.isActive():
+            # Brush strokes emit this per mouse move; refresh the indicator once per burst
+            self._modified_timer.start()
+    
+    def _flush_modified(self):
+        """Bring the save indicator up to date after a burst of modifications."""
+        self.image_controls.update_save_indicator(self._save_state == SaveState.SAVED)
     
     def on_sam_marker_removed(self, event):
         """Handle SAM marker removal - regenerate mask with remaining markers."""
@@ -411,17 +522,22 @@ class MainWindow(QMainWindow):
             self.logger.error("SAM model not loaded")
             return
         
-        remaining_markers = event.data.get("markers", [])
+        # Restarting on each removal means a burst re-segments only once, at the end
+        self._marker_removal_timer.start()
+    
+    def _flush_marker_removal(self):
+        """Regenerate the mask from the markers left after a burst of removals."""
+        remaining_markers = self.canvas.get_sam_marker_array()
         
-        if remaining_markers:
+        if len(remaining_markers):
             # Regenerate mask with remaining markers
-
             self.apply_sam_with_markers(remaining_markers)
         else:
             # No markers left, clear the mask
             self.canvas.clearMask()
             self.on_mask_modified()
     
+    @Slot(bool)
     def on_auto_sam_toggled(self, enabled):
         """Handle Auto SAM toggle."""
         if enabled:
@@ -436,16 +552,27 @@ class MainWindow(QMainWindow):
             self.logger.error("No image path provided for auto SAM")
             return
         
+        if not self._sam_ready:
+            # Still loading in the background; run once it is ready
+            self._pending_sam_request = lambda: self.apply_auto_sam(image_path)
+            return
+        
         # Load SAM on demand when Auto SAM is used
         if not self.sam_loaded or self.current_sam_image != image_path:
             if not self.load_sam_for_current_image():
                 self.logger.error("Failed to load SAM model for auto SAM")
                 return
         
-        # Use the auto SAM service to get the centroid point
-        centroid_point = self.auto_sam_service.generate_auto_mask(image_path)
-        if centroid_point:
-            self.apply_auto_sam_point(centroid_point)
+        # The auto SAM service finds the centroid in the background
+        self.auto_sam_service.generate_auto_mask(image_path)
+    
+    @Slot(str, QPoint)
+    def on_auto_mask_generated(self, image_path, point):
+        """Apply SAM at an auto-generated centroid if its image is still current."""
+        if image_path != self.image_manager.get_current_image_path() or image_path != self.current_sam_image:
+            self.logger.debug(f"Discarding stale auto SAM result for {image_path}")
+            return
+        self.apply_auto_sam_point(point)
     
     def apply_auto_sam_point(self, point):
         """Apply SAM with the auto-generated point."""
@@ -489,12 +616,11 @@ class MainWindow(QMainWindow):
         placeholder_type = "default"
         if self.image_manager.selected_folders and self.image_manager.viewing_mode == "unlabelled":
             # Check if we have folders selected but no unlabelled images
-            total_images = 0
-            for folder_name in self.image_manager.selected_folders:
-                folder_images = self.experiment_service.get_folder_image_paths(
-                    self.image_manager.current_experiment, folder_name
-                )
-                total_images += len(folder_images)
+            experiment = self.image_manager.current_experiment
+            total_images = sum(
+                self.experiment_service.get_folder_image_count(experiment, folder_name)
+                for folder_name in self.image_manager.selected_folders
+            )
             
             if total_images > 0:
                 placeholder_type = "no_unlabelled"
@@ -511,6 +637,4 @@ class MainWindow(QMainWindow):
         self.image_controls.set_navigation_enabled(has_images)
         
         # Reset save state
-        self.mask_is_saved = True
-        self.current_mask_modified = False
-        self.image_controls.update_save_indicator(self.mask_is_saved)
+        self._set_save_state(SaveState.SAVED)
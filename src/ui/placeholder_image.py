@@ -1,8 +1,43 @@
 """
 Create a placeholder image for the canvas when no images are loaded.
 """
+from functools import lru_cache
 from PySide6.QtGui import QImage, QPainter, QFont, QColor
 
+# Instruction lines for each placeholder type
+_INSTRUCTIONS = {
+    "no_unlabelled": (
+        "All images in selected folders have been labelled!",
+        "",
+        "Options:",
+        "• Switch to 'Labelled' view to review masks",
+        "• Select different folders",
+        "• Add more images to current folders",
+    ),
+    "no_images": (
+        "No images found in selected folders",
+        "",
+        "Please:",
+        "• Check that folders contain image files",
+        "• Select different folders",
+        "• Verify experiment data directory",
+    ),
+    "default": (
+        "1. Select an experiment from the dropdown",
+        "2. Choose folders to view images from",
+        "3. Click 'Get Random Image' to start",
+        "",
+        "Use the tools on the left to:",
+        "• Draw masks with the brush tool",
+        "• Place markers for SAM segmentation",
+        "• Apply thresholding for auto-masks",
+    ),
+}
+
+# The render depends only on the arguments, so repeated no-image transitions
+# reuse it. QImage is implicitly shared: a caller that paints on the result
+# detaches its own copy and leaves the cached one untouched
+@lru_cache(maxsize=8)
 def create_placeholder_image(width: int = 500, height: int = 500, message_type: str = "default") -> QImage:
     """Create a placeholder image with app logo/text."""
     # Create image
@@ -31,42 +66,15 @@ def create_placeholder_image(width: int = 500, height: int = 500, message_type:
     instruction_font = QFont("Arial", 12)
     painter.setFont(instruction_font)
     painter.setPen(QColor(120, 120, 120))
+    # One metrics object for every instruction line
+    metrics = painter.fontMetrics()
     
-    if message_type == "no_unlabelled":
-        instructions = [
-            "All images in selected folders have been labelled!",
-            "",
-            "Options:",
-            "• Switch to 'Labelled' view to review masks",
-            "• Select different folders",
-            "• Add more images to current folders",
-        ]
-    elif message_type == "no_images":
-        instructions = [
-            "No images found in selected folders",
-            "",
-            "Please:",
-            "• Check that folders contain image files",
-            "• Select different folders",
-            "• Verify experiment data directory"
-        ]
-    else:  # default
-        instructions = [
-            "1. Select an experiment from the dropdown",
-            "2. Choose folders to view images from",
-            "3. Click 'Get Random Image' to start",
-            "",
-            "Use the tools on the left to:",
-            "• Draw masks with the brush tool",
-            "• Place markers for SAM segmentation",
-            "• Apply thresholding for auto-masks"
-        ]
+    instructions = _INSTRUCTIONS.get(message_type, _INSTRUCTIONS["default"])
     
     y_offset = height // 2 + 20
     for i, instruction in enumerate(instructions):
         if instruction:  # Skip empty lines
-            text_rect = painter.fontMetrics().boundingRect(instruction)
-            text_x = (width - text_rect.width()) // 2
+            text_x = (width - metrics.boundingRect(instruction).width()) // 2
             painter.drawText(text_x, y_offset + i * 25, instruction)
         else:
             y_offset += 10  # Extra space for empty lines
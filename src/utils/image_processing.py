@@ -2,7 +2,15 @@ import cv2
 import numpy as np
 from PySide6.QtGui import QImage
 
-def threshold_image(filepath: str, threshold: int) -> QImage:
+# ARGB32 pixel (B, G, R, A bytes) indexed by whether a pixel is above the
+# threshold: pixels at or below it become opaque mask, pixels above stay transparent
+_THRESH_LUT = np.array([[255, 0, 0, 255], [0, 0, 0, 0]], dtype=np.uint8)
+
+# Reused ARGB output buffer keyed by (height, width); only the latest size is
+# kept, since thresholding repeats on one image while its slider moves
+_SCRATCH = {}
+
+def load_threshold_source(filepath: str) -> np.ndarray:
     # Load the 16-bit image using OpenCV
     image = cv2.imread(filepath, cv2.IMREAD_UNCHANGED)
     
@@ -13,26 +21,29 @@ def threshold_image(filepath: str, threshold: int) -> QImage:
     if image.dtype != np.uint16:
         raise ValueError("Image is not 16-bit.")
 
-    # Normalize the 16-bit image to 8-bit
-    image_8bit = cv2.convertScaleAbs(image, alpha=(255.0/65535.0))
-
-    # Normalize the 16-bit image to 8-bit
-    image_8bit = cv2.convertScaleAbs(image, alpha=(255.0 / 65535.0))
-
-    # Apply the threshold
-    _, binary_mask = cv2.threshold(image_8bit, threshold, 255, cv2.THRESH_BINARY)
-
-    # Create an empty ARGB image
-    height, width = binary_mask.shape
-    mask = np.zeros((height, width, 4), dtype=np.uint8)
-
-    # Set white pixels to transparent
-    mask[binary_mask == 255] = [0, 0, 0, 0]
-
-    # Set black pixels to fully red
-    mask[binary_mask == 0] = [255, 0, 0, 255]
-
-    # Convert the mask to QImage
-    qimage = QImage(mask.data, width, height, QImage.Format_ARGB32)
+    return image
+
+def threshold_image_np(image_16bit: np.ndarray, threshold: int) -> QImage:
+    # The returned QImage wraps a scratch buffer that the next call for the
+    # same size overwrites; callers that keep the mask must copy it
+    # Threshold the 16-bit values directly. Scaling to 8-bit rounds v to
+    # round(v / 257), which exceeds the 8-bit threshold t exactly when
+    # v > 257 * t + 128, so no 8-bit copy of the image is needed
+    above = np.greater(image_16bit, int(threshold) * 257 + 128)
+
+    # Build the ARGB image in one gather through the lookup table
+    height, width = above.shape
+    buf = _SCRATCH.get((height, width))
+    if buf is None:
+        _SCRATCH.clear()
+        buf = _SCRATCH[(height, width)] = np.empty((height, width, 4), dtype=np.uint8)
+    np.take(_THRESH_LUT, above.view(np.uint8), axis=0, out=buf)
+
+    # Wrap the buffer without copying; it stays alive in _SCRATCH
+    qimage = QImage(buf.data, width, height, buf.strides[0], QImage.Format_ARGB32)
     
-    return qimage
\ No newline at end of file
+    return qimage
+
+def threshold_image(filepath: str, threshold: int) -> QImage:
+    # Standalone use gets an image that owns its pixels
+    return threshold_image_np(load_threshold_source(filepath), threshold).copy()
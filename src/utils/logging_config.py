@@ -5,11 +5,24 @@ This module sets up centralized logging for the entire application,
 providing structured error reporting and debugging capabilities.
 """
 
+import atexit
 import logging
 import logging.handlers
+import os
+import queue
 from pathlib import Path
 from datetime import datetime
 
+# Log files go in logs/ at the project root (next to src/), whatever the cwd
+LOG_DIR = Path(__file__).resolve().parents[2] / "logs"
+
+# Settings of the last setup_logging call and the handlers it attached, so a
+# repeat call with the same settings leaves the existing handlers in place
+_active_setup = None
+
+# Background thread that writes queued records to the real handlers
+_listener = None
+
 
 def setup_logging(log_level=logging.INFO, log_to_file=True):
     """
@@ -22,8 +35,17 @@ def setup_logging(log_level=logging.INFO, log_to_file=True):
     Returns:
         logging.Logger: Configured root logger
     """
+    global _active_setup, _listener
+    root_logger = logging.getLogger()
+    
+    # Already configured this way; don't reopen the log file
+    if _active_setup is not None:
+        settings, handlers = _active_setup
+        if settings == (log_level, log_to_file) and root_logger.handlers == handlers:
+            return root_logger
+    
     # Create logs directory if it doesn't exist
-    log_dir = Path("logs")
+    log_dir = LOG_DIR
     log_dir.mkdir(exist_ok=True)
     
     # Create formatter for log messages
@@ -33,17 +55,19 @@ def setup_logging(log_level=logging.INFO, log_to_file=True):
     )
     
     # Configure root logger
-    root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
     
-    # Clear any existing handlers
+    # Clear any existing handlers, flushing the previous listener first
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
     root_logger.handlers.clear()
     
     # Console handler - only show WARNING and above to keep console clean
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.WARNING)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    handlers = [console_handler]
     
     if log_to_file:
         # File handler for all log levels
@@ -58,7 +82,16 @@ def setup_logging(log_level=logging.INFO, log_to_file=True):
         )
         file_handler.setLevel(log_level)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    # Logging calls only enqueue the record; console and file writes (and log
+    # rotation) happen on the listener thread, never in the GUI or SAM threads
+    log_queue = queue.Queue(-1)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    
+    _active_setup = ((log_level, log_to_file), list(root_logger.handlers))
     
     # Log startup message
     logger = logging.getLogger("organoid_segmentation")
@@ -69,6 +102,13 @@ def setup_logging(log_level=logging.INFO, log_to_file=True):
     return root_logger
 
 
+@atexit.register
+def _stop_listener():
+    """Write out any queued records before the interpreter exits."""
+    if _listener is not None:
+        _listener.stop()
+
+
 def get_logger(name):
     """
     Get a logger instance for a specific module.
@@ -82,5 +122,7 @@ def get_logger(name):
     return logging.getLogger(name)
 
 
-# Default setup - can be overridden by calling setup_logging() again
-setup_logging()
+# Default setup - can be overridden by calling setup_logging() again with
+# other settings. Set SAMWISE_LOG=0 to import without touching the log file
+if os.environ.get("SAMWISE_LOG", "1") != "0":
+    setup_logging()
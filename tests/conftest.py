@@ -0,0 +1,31 @@
+"""
+Shared test setup: import the application packages from src/ and provide
+a Qt application so widgets and the event bus's timers work without a display.
+"""
+import os
+import sys
+
+# Keep test runs out of the application log file, and off any display
+os.environ.setdefault("SAMWISE_LOG", "0")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import pytest
+from PySide6.QtWidgets import QApplication
+
+from core.events import event_bus
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """The process-wide Qt application, created once."""
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture(autouse=True)
+def clean_event_bus(qapp):
+    """Give every test an event bus with no subscribers or pending events."""
+    event_bus.clear_all()
+    yield event_bus
+    event_bus.clear_all()
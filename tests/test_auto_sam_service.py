@@ -0,0 +1,101 @@
+"""
+Tests for AutoSamService's largest-region centroid, on synthetic images.
+"""
+import logging
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from services.auto_sam_service import AutoSamService
+
+BACKGROUND = 230
+FOREGROUND = 30
+
+
+def _write(tmp_path, image, name="image.png"):
+    path = str(tmp_path / name)
+    cv2.imwrite(path, image)
+    return path
+
+
+def _image_with_regions(*rects, shape=(160, 200)):
+    """A light image with dark (x, y, width, height) rectangles."""
+    image = np.full(shape, BACKGROUND, dtype=np.uint8)
+    for x, y, width, height in rects:
+        image[y:y + height, x:x + width] = FOREGROUND
+    return image
+
+
+@pytest.fixture
+def service():
+    return AutoSamService(model_service=None, downsample_factor=1)
+
+
+def test_centroid_of_the_largest_dark_region(service, tmp_path):
+    # Small square top left, large rectangle centred on (129.5, 79.5)
+    path = _write(tmp_path, _image_with_regions((10, 10, 20, 20), (100, 40, 60, 80)))
+
+    centroid = service.find_centroid(path)
+    assert (centroid.x(), centroid.y()) == (129, 79)
+
+
+def test_diagonally_touching_pixels_form_one_region(service, tmp_path):
+    # Two 30x30 squares meeting at a corner outweigh one 40x40 square
+    path = _write(tmp_path, _image_with_regions((20, 20, 30, 30), (50, 50, 30, 30), (130, 100, 40, 40)))
+
+    centroid = service.find_centroid(path)
+    assert (centroid.x(), centroid.y()) == (49, 49)
+
+
+def test_uniform_image_has_no_region(service, tmp_path):
+    path = _write(tmp_path, _image_with_regions())
+    assert service.find_centroid(path) is None
+
+
+@pytest.mark.parametrize("factor", [2, 3, 4])
+def test_downsampled_centroid_is_within_one_step_of_full_resolution(tmp_path, factor):
+    # Odd offsets and sizes, so region edges fall between downsampled pixels
+    path = _write(tmp_path, _image_with_regions((11, 13, 21, 17), (101, 37, 61, 83), shape=(161, 203)))
+
+    full = AutoSamService(model_service=None, downsample_factor=1).find_centroid(path)
+    reduced = AutoSamService(model_service=None, downsample_factor=factor).find_centroid(path)
+    assert abs(reduced.x() - full.x()) <= factor
+    assert abs(reduced.y() - full.y()) <= factor
+
+
+
+def test_centroid_is_cached_until_the_file_changes(service, tmp_path, monkeypatch):
+    reads = []
+    imread = cv2.imread
+
+    def recording_imread(path, *args):
+        reads.append(path)
+        return imread(path, *args)
+
+    monkeypatch.setattr(cv2, "imread", recording_imread)
+
+    path = _write(tmp_path, _image_with_regions((100, 40, 60, 80)))
+    first = service.find_centroid(path)
+    assert service.find_centroid(path) == first
+    assert len(reads) == 1
+
+    # Rewritten in place, with a later mtime even on coarse file system clocks
+    _write(tmp_path, _image_with_regions((10, 10, 40, 40)))
+    mtime = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+    centroid = service.find_centroid(path)
+    assert (centroid.x(), centroid.y()) == (29, 29)
+    assert len(reads) == 2
+
+
+def test_missing_image_logs_one_line_without_traceback(service, tmp_path, caplog):
+    caplog.set_level(logging.ERROR)
+
+    assert service.find_centroid(str(tmp_path / "missing.png")) is None
+    assert [record.getMessage() for record in caplog.records] == [
+        f"Could not load image: {tmp_path / 'missing.png'}"
+    ]
+    assert caplog.records[0].exc_info is None
@@ -0,0 +1,85 @@
+"""
+Tests for DrawingCanvas's QImage/ndarray conversions, against the original
+PNG round-trip and per-pixel implementations.
+"""
+import cv2
+import numpy as np
+import pytest
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, Qt
+from PySide6.QtGui import QColor, QImage
+
+from ui.drawing_canvas import DrawingCanvas
+
+
+def _png_round_trip(image):
+    """The original QImageToCvMat: encode to PNG and decode with OpenCV."""
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.ReadWrite)
+    image.save(buffer, "PNG")
+    return cv2.imdecode(np.frombuffer(bytes(data.data()), dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def _random_image(width, height, fmt, seed=0):
+    """An opaque QImage of random pixels in the given format."""
+    rgba = np.random.default_rng(seed).integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+    rgba[..., 3] = 255
+    image = QImage(rgba.data, width, height, width * 4, QImage.Format_RGBA8888)
+    return image.convertToFormat(fmt)
+
+
+@pytest.fixture
+def canvas(qapp):
+    return DrawingCanvas()
+
+
+@pytest.mark.parametrize("fmt", [
+    QImage.Format_RGB32,
+    QImage.Format_ARGB32,
+    QImage.Format_RGBA8888,
+    QImage.Format_RGB888,
+    QImage.Format_Grayscale8,
+])
+@pytest.mark.parametrize("width", [1, 5, 64])
+def test_qimage_to_cv_mat_matches_png_round_trip(canvas, fmt, width):
+    # Odd widths pad each BGR888 row to a multiple of 4 bytes, which the direct view must skip
+    image = _random_image(width, 7, fmt)
+
+    converted = canvas.QImageToCvMat(image)
+    assert converted.dtype == np.uint8 and converted.flags["C_CONTIGUOUS"]
+    assert np.array_equal(converted, _png_round_trip(image))
+
+
+def _per_pixel_crop(image, mask):
+    """The original crop_by_mask: whiten each pixel whose mask alpha is 0, one at a time."""
+    cropped = image.copy()
+    for y in range(image.height()):
+        for x in range(image.width()):
+            if mask.pixelColor(x, y).alpha() == 0:
+                cropped.setPixelColor(x, y, QColor(Qt.white))
+    return _png_round_trip(cropped)
+
+
+@pytest.mark.parametrize("mask_format", [QImage.Format_ARGB32, QImage.Format_ARGB32_Premultiplied])
+def test_crop_by_mask_matches_per_pixel_crop(canvas, mask_format):
+    width, height = 23, 17
+    canvas.set_image(_random_image(width, height, QImage.Format_RGB32))
+
+    # Alpha 0 outside, partial and full alpha inside, so only alpha == 0 is whitened
+    alpha = np.zeros((height, width), dtype=np.uint8)
+    alpha[3:12, 4:15] = 255
+    alpha[12:15, 4:15] = 1
+    rgba = np.zeros((height, width, 4), dtype=np.uint8)
+    rgba[..., 2] = 255
+    rgba[..., 3] = alpha
+    mask = QImage(rgba.data, width, height, width * 4, QImage.Format_RGBA8888).convertToFormat(mask_format)
+    canvas.set_mask(mask)
+
+    cropped = canvas.crop_by_mask()
+    assert np.array_equal(cropped, _per_pixel_crop(canvas.image, canvas.mask))
+    assert (cropped[alpha == 0] == 255).all()
+
+
+def test_crop_by_mask_without_a_mask(canvas):
+    canvas.set_image(_random_image(4, 4, QImage.Format_RGB32))
+    assert canvas.crop_by_mask() is None
@@ -0,0 +1,194 @@
+"""
+Tests for the EventBus: subscriber table, weak subscribers, batching and
+asynchronous dispatch.
+"""
+import gc
+
+from PySide6.QtTest import QTest
+
+from core.events import Event, EventType, event_bus
+
+
+def _recorder():
+    """Create a callback that records the events it receives."""
+    received = []
+
+    def callback(event):
+        received.append(event)
+
+    return callback, received
+
+
+def test_each_event_type_reaches_only_its_subscribers():
+    received = {}
+    for event_type in EventType:
+        received[event_type] = []
+        event_bus.subscribe(event_type, received[event_type].append)
+
+    for event_type in EventType:
+        event_bus.publish(Event(event_type, data=event_type.name))
+
+    for event_type, events in received.items():
+        assert [(e.event_type, e.data) for e in events] == [(event_type, event_type.name)]
+
+
+def test_subscribers_are_called_in_subscription_order():
+    calls = []
+    event_bus.subscribe(EventType.MASK_CREATED, lambda event: calls.append("first"))
+    event_bus.subscribe(EventType.MASK_CREATED, lambda event: calls.append("second"))
+
+    event_bus.publish(Event(EventType.MASK_CREATED))
+    assert calls == ["first", "second"]
+
+
+def test_unsubscribe_function_and_clear_all():
+    callback, received = _recorder()
+    event_bus.subscribe(EventType.MASK_CREATED, callback)
+    event_bus.subscribe(EventType.MASK_CLEARED, callback)
+
+    event_bus.unsubscribe(EventType.MASK_CREATED, callback)
+    event_bus.publish(Event(EventType.MASK_CREATED))
+    event_bus.publish(Event(EventType.MASK_CLEARED))
+    assert [e.event_type for e in received] == [EventType.MASK_CLEARED]
+
+    event_bus.clear_all()
+    event_bus.publish(Event(EventType.MASK_CLEARED))
+    assert len(received) == 1
+
+
+class _Listener:
+    """Subscriber owning a bound-method callback that records into a shared list."""
+
+    def __init__(self, received):
+        self.received = received
+
+    def on_event(self, event):
+        self.received.append(event)
+
+
+def test_bound_method_subscriber_expires_with_its_owner():
+    received = []
+    listener = _Listener(received)
+    event_bus.subscribe(EventType.MASK_CREATED, listener.on_event)
+    event_bus.publish(Event(EventType.MASK_CREATED, data=1))
+
+    # The bus must not keep the listener alive
+    del listener
+    gc.collect()
+    event_bus.publish(Event(EventType.MASK_CREATED, data=2))
+    assert [e.data for e in received] == [1]
+
+
+def test_expired_subscriber_does_not_affect_live_ones():
+    received = []
+    listener = _Listener(received)
+    callback, others = _recorder()
+    event_bus.subscribe(EventType.MASK_CREATED, listener.on_event)
+    event_bus.subscribe(EventType.MASK_CREATED, callback)
+
+    del listener
+    gc.collect()
+    event_bus.publish(Event(EventType.MASK_CREATED, data=1))
+    event_bus.publish(Event(EventType.MASK_CREATED, data=2))
+    assert received == []
+    assert [e.data for e in others] == [1, 2]
+
+
+def test_plain_function_subscriber_is_held_strongly():
+    callback, received = _recorder()
+    event_bus.subscribe(EventType.MASK_CREATED, callback)
+    del callback
+    gc.collect()
+
+    event_bus.publish(Event(EventType.MASK_CREATED, data=1))
+    assert [e.data for e in received] == [1]
+
+
+def test_unsubscribe_bound_method():
+    received = []
+    listener = _Listener(received)
+    event_bus.subscribe(EventType.MASK_CREATED, listener.on_event)
+    event_bus.unsubscribe(EventType.MASK_CREATED, listener.on_event)
+
+    event_bus.publish(Event(EventType.MASK_CREATED))
+    assert received == []
+
+
+def test_batch_coalesces_by_type_until_outermost_exit():
+    callback, received = _recorder()
+    event_bus.subscribe(EventType.MASK_CREATED, callback)
+    event_bus.subscribe(EventType.MASK_CLEARED, callback)
+
+    with event_bus.batch():
+        event_bus.publish(Event(EventType.MASK_CREATED, data=1))
+        with event_bus.batch():
+            event_bus.publish(Event(EventType.MASK_CLEARED, data="a"))
+            event_bus.publish(Event(EventType.MASK_CREATED, data=2))
+        # Leaving the inner batch does not flush
+        assert received == []
+
+    # One event per type, with the latest data, in first-published order
+    assert [(e.event_type, e.data) for e in received] == [
+        (EventType.MASK_CREATED, 2),
+        (EventType.MASK_CLEARED, "a"),
+    ]
+
+
+def test_batch_flushes_when_the_block_raises():
+    callback, received = _recorder()
+    event_bus.subscribe(EventType.MASK_CREATED, callback)
+
+    try:
+        with event_bus.batch():
+            event_bus.publish(Event(EventType.MASK_CREATED, data=1))
+            raise RuntimeError
+    except RuntimeError:
+        pass
+
+    assert [e.data for e in received] == [1]
+    event_bus.publish(Event(EventType.MASK_CREATED, data=2))
+    assert [e.data for e in received] == [1, 2]
+
+
+def test_publish_async_defers_and_keeps_queue_order():
+    callback, received = _recorder()
+    event_bus.subscribe(EventType.MASK_CREATED, callback)
+    event_bus.subscribe(EventType.MASK_CLEARED, callback)
+
+    event_bus.publish_async(Event(EventType.MASK_CREATED, data=1))
+    event_bus.publish_async(Event(EventType.MASK_CLEARED, data="a"))
+    event_bus.publish_async(Event(EventType.MASK_CREATED, data=2))
+    assert received == []
+
+    QTest.qWait(10)
+    # A repeated type keeps its queue position but carries the latest data
+    assert [(e.event_type, e.data) for e in received] == [
+        (EventType.MASK_CREATED, 2),
+        (EventType.MASK_CLEARED, "a"),
+    ]
+
+
+def test_publish_async_drains_events_queued_by_callbacks_in_same_pump():
+    callback, received = _recorder()
+
+    def chain(event):
+        received.append(event)
+        event_bus.publish_async(Event(EventType.MASK_CLEARED, data="chained"))
+
+    event_bus.subscribe(EventType.MASK_CREATED, chain)
+    event_bus.subscribe(EventType.MASK_CLEARED, callback)
+
+    event_bus.publish_async(Event(EventType.MASK_CREATED, data=1))
+    QTest.qWait(10)
+    assert [e.data for e in received] == [1, "chained"]
+
+
+def test_publish_async_can_be_used_again_after_a_pump():
+    callback, received = _recorder()
+    event_bus.subscribe(EventType.MASK_CREATED, callback)
+
+    event_bus.publish_async(Event(EventType.MASK_CREATED, data=1))
+    QTest.qWait(10)
+    event_bus.publish_async(Event(EventType.MASK_CREATED, data=2))
+    QTest.qWait(10)
+    assert [e.data for e in received] == [1, 2]
@@ -0,0 +1,47 @@
+"""
+Tests for ExperimentManager's throttled experiment switching.
+"""
+import os
+
+import pytest
+from PySide6.QtTest import QTest
+
+from core.events import EventType, event_bus
+from services.experiment_service import ExperimentService
+from ui.components.experiment_manager import EXPERIMENT_SELECT_INTERVAL_MS, ExperimentManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """An ExperimentManager over four empty experiments."""
+    for number in range(1, 5):
+        os.makedirs(tmp_path / "Data" / f"Experiment {number}" / "d1")
+    return ExperimentManager(ExperimentService(str(tmp_path)))
+
+
+def test_dropdown_bursts_switch_on_leading_and_trailing_edges(manager):
+    emitted = []
+    published = []
+    manager.experiment_changed.connect(lambda experiment: emitted.append(experiment.name))
+    event_bus.subscribe(EventType.EXPERIMENT_CHANGED, lambda event: published.append(event.data["experiment"].name))
+    service = manager.experiment_service
+
+    for index in (1, 2, 3):
+        manager.experiment_dropdown.setCurrentIndex(index)
+
+    # Leading edge: the first change of a burst is applied at once
+    assert emitted == ["Experiment 2"]
+    assert service.get_current_experiment().name == "Experiment 2"
+
+    # Trailing edge: only the latest of the rest, when the interval ends
+    QTest.qWait(EXPERIMENT_SELECT_INTERVAL_MS * 3)
+    assert emitted == ["Experiment 2", "Experiment 4"]
+    assert service.get_current_experiment().name == "Experiment 4"
+    assert published == emitted
+
+    # Once quiet for an interval, the next change is a new leading edge
+    manager.experiment_dropdown.setCurrentIndex(0)
+    assert emitted[-1] == "Experiment 1"
+    QTest.qWait(EXPERIMENT_SELECT_INTERVAL_MS * 3)
+    assert emitted == ["Experiment 2", "Experiment 4", "Experiment 1"]
+
@@ -0,0 +1,122 @@
+"""
+Tests for ExperimentService's cached mask and folder lookups, and their
+invalidation when masks are saved or folders change.
+"""
+import os
+
+import pytest
+
+from core.events import Event, EventType, event_bus
+from services.experiment_service import ExperimentService
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb"):
+        pass
+
+
+@pytest.fixture
+def project(tmp_path):
+    """
+    One experiment with two folders:
+        d1: a.png (labelled), b.png, c.png
+        d2: d.png
+    """
+    data = tmp_path / "Data" / "Experiment 1"
+    for name in ("d1/a.png", "d1/b.png", "d1/c.png", "d2/d.png"):
+        _touch(str(data / name))
+    _touch(str(tmp_path / "Labels" / "Experiment 1" / "d1" / "a.png"))
+    return tmp_path
+
+
+@pytest.fixture
+def service(project):
+    return ExperimentService(str(project))
+
+
+def _image(project, name):
+    return str(project / "Data" / "Experiment 1" / name)
+
+
+def _save_mask(project, name):
+    """Write a mask file and announce it, as ImageManager.save_mask does."""
+    mask_path = str(project / "Labels" / "Experiment 1" / name)
+    _touch(mask_path)
+    event_bus.publish(Event(
+        event_type=EventType.MASK_CREATED,
+        data={"mask_path": mask_path, "image_path": _image(project, name)},
+        source="image_manager"
+    ))
+
+
+def test_has_mask_and_get_mask_path(service, project):
+    assert service.has_mask(_image(project, "d1/a.png"))
+    assert service.get_mask_path(_image(project, "d1/a.png")) == str(project / "Labels" / "Experiment 1" / "d1" / "a.png")
+    assert not service.has_mask(_image(project, "d1/b.png"))
+    assert service.get_mask_path(_image(project, "d1/b.png")) is None
+    # Folders without a labels folder, and paths outside the data directory
+    assert not service.has_mask(_image(project, "d2/d.png"))
+    assert not service.has_mask(str(project / "elsewhere.png"))
+
+
+def test_mask_cache_is_invalidated_by_mask_created(service, project):
+    assert not service.has_mask(_image(project, "d1/b.png"))
+
+    # Written without telling the app: the cached listing still applies
+    _touch(str(project / "Labels" / "Experiment 1" / "d1" / "b.png"))
+    assert not service.has_mask(_image(project, "d1/b.png"))
+
+    _save_mask(project, "d1/c.png")
+    assert service.has_mask(_image(project, "d1/b.png"))
+    assert service.has_mask(_image(project, "d1/c.png"))
+
+
+def test_labelled_and_unlabelled_images_follow_saved_masks(service, project):
+    experiment = service.get_experiments()[0]
+    assert service.get_labeled_images(experiment, ["d1", "d2"]) == [_image(project, "d1/a.png")]
+    assert service.get_unlabeled_images(experiment, ["d1", "d2"]) == [
+        _image(project, name) for name in ("d1/b.png", "d1/c.png", "d2/d.png")
+    ]
+
+    _save_mask(project, "d2/d.png")
+    assert service.get_labeled_images(experiment, ["d1", "d2"]) == [
+        _image(project, "d1/a.png"), _image(project, "d2/d.png")
+    ]
+    assert service.get_unlabeled_images(experiment, ["d2"]) == []
+
+
+def test_refresh_experiments_drops_the_labelled_set(service, project):
+    experiment = service.get_experiments()[0]
+    assert service.get_labeled_images(experiment, ["d1"]) == [_image(project, "d1/a.png")]
+
+    os.remove(project / "Labels" / "Experiment 1" / "d1" / "a.png")
+    service.refresh_experiments()
+    assert service.get_labeled_images(service.get_experiments()[0], ["d1"]) == []
+
+
+def _bump_mtime(path):
+    """Move a directory's mtime forward; file system timestamps can be too coarse to differ."""
+    mtime = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_folder_listing_is_cached_until_the_folder_changes(service, project, monkeypatch):
+    experiment = service.get_experiments()[0]
+    folder = project / "Data" / "Experiment 1" / "d1"
+    assert service.get_folder_image_count(experiment, "d1") == 3
+    assert service.get_folder_image_paths(experiment, "d1") == [
+        _image(project, name) for name in ("d1/a.png", "d1/b.png", "d1/c.png")
+    ]
+
+    # An unchanged folder is served without listing it again
+    monkeypatch.setattr(os, "scandir", None)
+    assert service.get_folder_image_count(experiment, "d1") == 3
+    monkeypatch.undo()
+
+    _touch(str(folder / "e.png"))
+    _touch(str(folder / "notes.txt"))
+    _bump_mtime(folder)
+    assert service.get_folder_image_count(experiment, "d1") == 4
+    assert service.get_folder_image_paths(experiment, "d1")[-1] == _image(project, "d1/e.png")
+    assert service.get_folder_image_count(experiment, "missing") == 0
@@ -0,0 +1,273 @@
+"""
+Tests for ImageManager's lazily listed image pool and navigation, on a
+temporary Data/Labels tree.
+"""
+import os
+
+import cv2
+import numpy as np
+import pytest
+from PySide6.QtGui import QImage
+
+from services.experiment_service import ExperimentService
+from services.image_manager import ImageManager
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb"):
+        pass
+
+
+@pytest.fixture
+def project(tmp_path):
+    """
+    One experiment with three folders:
+        d1: a.png (labelled), b.png, c.png
+        d2: d.png
+        d3: e.png (labelled), notes.txt
+    """
+    data = tmp_path / "Data" / "Experiment 1"
+    labels = tmp_path / "Labels" / "Experiment 1"
+    for name in ("d1/c.png", "d1/a.png", "d1/b.png", "d2/d.png", "d3/e.png", "d3/notes.txt"):
+        _touch(str(data / name))
+    for name in ("d1/a.png", "d3/e.png"):
+        _touch(str(labels / name))
+    return tmp_path
+
+
+@pytest.fixture
+def manager(project):
+    """An ImageManager with the test experiment selected."""
+    experiment_service = ExperimentService(str(project))
+    image_manager = ImageManager(experiment_service)
+    # Publishes EXPERIMENT_CHANGED, which ImageManager handles synchronously
+    experiment_service.set_current_experiment(experiment_service.get_experiments()[0])
+    return image_manager
+
+
+def _names(paths):
+    """Reduce image paths to "folder/filename"."""
+    return [os.path.join(*path.split(os.sep)[-2:]) for path in paths]
+
+
+def test_experiment_change_resets_selection(manager):
+    assert manager.current_experiment.name == "Experiment 1"
+    assert manager.selected_folders == []
+    assert manager.get_num_images() == 0
+    assert manager.get_current_image_path() == ""
+
+
+def test_pool_lists_folders_lazily_in_selection_order(manager, monkeypatch):
+    scanned = []
+    scandir = os.scandir
+
+    def recording_scandir(path):
+        scanned.append(os.path.basename(path))
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", recording_scandir)
+    manager.set_selected_folders(["d2", "d1"])
+
+    # Selecting lists only the first folder (and its labels), to find the current image
+    assert _names([manager.get_current_image_path()]) == [os.path.join("d2", "d.png")]
+    assert "d2" in scanned and "d1" not in scanned
+
+    assert manager.get_num_images() == 3
+    assert _names(manager.image_pool) == [
+        os.path.join("d2", "d.png"),
+        os.path.join("d1", "b.png"),
+        os.path.join("d1", "c.png"),
+    ]
+
+
+def test_next_and_previous_wrap_around(manager):
+    manager.set_selected_folders(["d1", "d2"])
+    pool = manager.image_pool
+    assert manager.get_current_image_path() == pool[0]
+
+    visited = [manager.get_next_image() for _ in range(len(pool))]
+    assert visited == pool[1:] + pool[:1]
+
+    assert manager.get_previous_image() == pool[-1]
+    assert manager.get_image_index() == len(pool) - 1
+
+
+def test_get_image_by_index_out_of_range(manager):
+    manager.set_selected_folders(["d1"])
+    current = manager.get_current_image_path()
+
+    assert manager.get_image_by_index(5) is None
+    assert manager.get_image_by_index(-1) is None
+    assert manager.get_current_image_path() == current
+
+
+def test_random_image_comes_from_pool(manager):
+    manager.set_selected_folders(["d1", "d2"])
+    assert manager.get_random_image() in manager.image_pool
+
+
+def _bump_mtime(path):
+    """Move a directory's mtime forward; file system timestamps can be too coarse to differ."""
+    mtime = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_viewing_mode_switches_between_partitions(manager, monkeypatch):
+    manager.set_selected_folders(["d1", "d3"])
+    assert _names(manager.image_pool) == [os.path.join("d1", "b.png"), os.path.join("d1", "c.png")]
+
+    # Toggling the mode is served from the cached partitions, without rescanning
+    monkeypatch.setattr(os, "scandir", None)
+    manager.set_viewing_mode("labelled")
+    assert _names(manager.image_pool) == [os.path.join("d1", "a.png"), os.path.join("d3", "e.png")]
+
+    manager.set_viewing_mode("unlabelled")
+    assert manager.get_num_images() == 2
+
+
+def test_masks_changed_outside_the_app_are_picked_up(manager, project):
+    labels = project / "Labels" / "Experiment 1" / "d1"
+    manager.set_selected_folders(["d1"])
+    assert _names(manager.image_pool) == [os.path.join("d1", "b.png"), os.path.join("d1", "c.png")]
+
+    _touch(str(labels / "b.png"))
+    os.remove(labels / "a.png")
+    _bump_mtime(labels)
+
+    manager.get_random_image()
+    assert _names(manager.image_pool) == [os.path.join("d1", "a.png"), os.path.join("d1", "c.png")]
+    manager.set_viewing_mode("labelled")
+    assert _names(manager.image_pool) == [os.path.join("d1", "b.png")]
+    assert manager.has_mask(manager.image_pool[0])
+
+
+def test_saved_mask_moves_image_to_labelled(manager):
+    manager.set_selected_folders(["d1"])
+    saved = manager.get_current_image_path()
+    mask = QImage(4, 4, QImage.Format_ARGB32)
+    mask.fill(0)
+    assert manager.save_mask(mask)
+
+    manager.refresh_image_pool()
+    assert saved not in manager.image_pool
+    manager.set_viewing_mode("labelled")
+    assert saved in manager.image_pool
+    assert manager.has_mask(saved)
+
+
+def test_mask_and_cropped_paths_mirror_the_data_path(manager, project):
+    manager.set_selected_folders(["d1"])
+    manager.set_viewing_mode("labelled")
+    labelled = manager.get_current_image_path()
+    unlabelled = str(project / "Data" / "Experiment 1" / "d1" / "b.png")
+
+    assert manager.get_mask_path(labelled) == str(project / "Labels" / "Experiment 1" / "d1" / "a.png")
+    assert manager.get_mask_path(unlabelled) is None
+    assert not manager.cropped_image_exists(labelled)
+    assert manager.get_image_filename() == os.path.join("Experiment 1", "d1", "a.png")
+
+    # Paths outside the data directory have no mask or cropped image
+    outside = str(project / "elsewhere" / "a.png")
+    assert not manager.has_mask(outside)
+    assert manager.get_mask_path(outside) is None
+    assert not manager.cropped_image_exists(outside)
+
+
+def _write_crop_pair(project, relative_path, seed, mask_alpha=True):
+    """Write a grayscale image and its mask; mask alpha is 0 left of the middle column."""
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 255, size=(9, 12), dtype=np.uint8)
+    image_path = str(project / "Data" / "Experiment 1" / relative_path)
+    mask_path = str(project / "Labels" / "Experiment 1" / relative_path)
+    os.makedirs(os.path.dirname(mask_path), exist_ok=True)
+    cv2.imwrite(image_path, image)
+
+    alpha = np.zeros(image.shape, dtype=np.uint8)
+    alpha[:, 6:] = rng.integers(1, 256, size=(9, 6))
+    mask = np.dstack([np.full(image.shape, 255, np.uint8)] * 3 + ([alpha] if mask_alpha else []))
+    cv2.imwrite(mask_path, mask)
+
+    expected = image.copy()
+    if mask_alpha:
+        expected[alpha == 0] = 255
+    return image_path, mask_path, expected
+
+
+def _cropped(project, relative_path):
+    return cv2.imread(str(project / "Cropped" / "Experiment 1" / relative_path), cv2.IMREAD_UNCHANGED)
+
+
+def test_crop_image_by_mask_whitens_transparent_pixels(manager, project):
+    image_path, mask_path, expected = _write_crop_pair(project, os.path.join("d2", "d.png"), seed=0)
+    assert manager.crop_image_by_mask(image_path, mask_path)
+    assert np.array_equal(_cropped(project, os.path.join("d2", "d.png")), expected)
+
+    # A mask without an alpha channel leaves the image unchanged
+    image_path, mask_path, expected = _write_crop_pair(project, os.path.join("d1", "b.png"), seed=1, mask_alpha=False)
+    assert manager.crop_image_by_mask(image_path, mask_path)
+    assert np.array_equal(_cropped(project, os.path.join("d1", "b.png")), expected)
+
+
+def test_crop_image_by_mask_reports_unreadable_files(manager, project):
+    image_path, mask_path, _ = _write_crop_pair(project, os.path.join("d2", "d.png"), seed=0)
+    assert not manager.crop_image_by_mask(image_path, str(project / "missing.png"))
+    assert not manager.crop_image_by_mask(str(project / "Data" / "Experiment 1" / "d1" / "a.png"), mask_path)
+
+
+def _write_crop_folder(project, folder, count, seed):
+    """Write count labelled images into a folder, returning {relative path: expected crop}."""
+    expected = {}
+    for index in range(count):
+        relative_path = os.path.join(folder, f"img{index:02d}.png")
+        expected[relative_path] = _write_crop_pair(project, relative_path, seed=seed + index)[2]
+    return expected
+
+
+def test_crop_all_crops_every_labelled_image_across_threads(manager, project):
+    expected = _write_crop_folder(project, "d1", 12, seed=0)
+    expected.update(_write_crop_folder(project, "d2", 12, seed=100))
+
+    # d1/a.png and d3/e.png are labelled but empty files; they fail without stopping the rest
+    manager.crop_all_images_by_masks(["d1", "d2", "d3"])
+
+    for relative_path, image in expected.items():
+        assert np.array_equal(_cropped(project, relative_path), image), relative_path
+    # Unlabelled images are not cropped
+    assert _cropped(project, os.path.join("d1", "b.png")) is None
+
+
+def test_crop_all_skips_existing_crops_unless_overwriting(manager, project):
+    expected = _write_crop_folder(project, "d2", 3, seed=0)
+    existing = os.path.join("d2", "img01.png")
+    stale = np.zeros((2, 2), dtype=np.uint8)
+    os.makedirs(project / "Cropped" / "Experiment 1" / "d2")
+    cv2.imwrite(str(project / "Cropped" / "Experiment 1" / existing), stale)
+
+    manager.crop_all_images_by_masks(["d2"])
+    assert np.array_equal(_cropped(project, existing), stale)
+    assert np.array_equal(_cropped(project, os.path.join("d2", "img00.png")), expected[os.path.join("d2", "img00.png")])
+
+    manager.crop_all_images_by_masks(["d2"], overwrite=True)
+    assert np.array_equal(_cropped(project, existing), expected[existing])
+
+
+def test_crop_all_creates_each_output_folder_once(manager, project, monkeypatch):
+    _write_crop_folder(project, "d1", 4, seed=0)
+    _write_crop_folder(project, "d2", 4, seed=100)
+    created = []
+    makedirs = os.makedirs
+
+    def recording_makedirs(path, *args, **kwargs):
+        created.append(path)
+        return makedirs(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "makedirs", recording_makedirs)
+    manager.crop_all_images_by_masks(["d1", "d2", "d3"])
+
+    cropped_root = str(project / "Cropped" / "Experiment 1")
+    # d3 holds only an unreadable labelled image, but its folder is still prepared up front
+    # os.makedirs also recurses into itself for missing parents; count only the folders asked for
+    folders = sorted(path for path in created if os.path.dirname(path) == cropped_root)
+    assert folders == [os.path.join(cropped_root, folder) for folder in ("d1", "d2", "d3")]
+    assert len(os.listdir(os.path.join(cropped_root, "d1"))) == 4
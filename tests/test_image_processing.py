@@ -0,0 +1,73 @@
+"""
+Tests for thresholding 16-bit images into ARGB masks, against the original
+convert-to-8-bit-then-threshold implementation.
+"""
+import cv2
+import numpy as np
+import pytest
+
+from utils.image_processing import threshold_image, threshold_image_np
+
+
+def _reference_mask(image_16bit, threshold):
+    """The original threshold_image: scale to 8-bit, threshold, then paint pixel by pixel."""
+    image_8bit = cv2.convertScaleAbs(image_16bit, alpha=(255.0 / 65535.0))
+    _, binary_mask = cv2.threshold(image_8bit, threshold, 255, cv2.THRESH_BINARY)
+    mask = np.zeros(binary_mask.shape + (4,), dtype=np.uint8)
+    mask[binary_mask == 255] = [0, 0, 0, 0]
+    mask[binary_mask == 0] = [255, 0, 0, 255]
+    return mask
+
+
+def _pixels(qimage):
+    """Copy a QImage's ARGB32 pixels into an (H, W, 4) array."""
+    height, width = qimage.height(), qimage.width()
+    buffer = np.frombuffer(qimage.constBits(), np.uint8, count=qimage.sizeInBytes())
+    return buffer.reshape(height, qimage.bytesPerLine())[:, :width * 4].reshape(height, width, 4).copy()
+
+
+def test_lut_gather_matches_per_pixel_painting():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 65536, size=(37, 53), dtype=np.uint16)
+
+    for threshold in (0, 64, 128, 200, 255):
+        assert np.array_equal(_pixels(threshold_image_np(image, threshold)), _reference_mask(image, threshold))
+
+
+def test_threshold_image_reads_16_bit_files(tmp_path):
+    rng = np.random.default_rng(1)
+    image = rng.integers(0, 65536, size=(20, 30), dtype=np.uint16)
+    path = str(tmp_path / "image.png")
+    cv2.imwrite(path, image)
+
+    mask = threshold_image(path, 100)
+    # The standalone result owns its pixels, so later calls do not change it
+    threshold_image(path, 0)
+    assert np.array_equal(_pixels(mask), _reference_mask(image, 100))
+
+
+def test_threshold_image_rejects_8_bit_and_missing_files(tmp_path):
+    path = str(tmp_path / "image.png")
+    cv2.imwrite(path, np.zeros((4, 4), dtype=np.uint8))
+
+    with pytest.raises(ValueError):
+        threshold_image(path, 100)
+    with pytest.raises(ValueError):
+        threshold_image(str(tmp_path / "missing.png"), 100)
+
+
+@pytest.mark.parametrize("threshold", [0, 1, 2, 127, 128, 254, 255])
+def test_uint16_threshold_matches_8_bit_rounding_for_every_value(threshold):
+    # Every 16-bit value, including those either side of each rounding boundary
+    image = np.arange(65536, dtype=np.uint16).reshape(256, 256)
+    assert np.array_equal(_pixels(threshold_image_np(image, threshold)), _reference_mask(image, threshold))
+
+
+
+def test_scratch_buffer_follows_the_image_size():
+    small = np.full((3, 5), 65535, dtype=np.uint16)
+    large = np.zeros((6, 4), dtype=np.uint16)
+
+    assert np.array_equal(_pixels(threshold_image_np(small, 10)), _reference_mask(small, 10))
+    assert np.array_equal(_pixels(threshold_image_np(large, 10)), _reference_mask(large, 10))
+    assert np.array_equal(_pixels(threshold_image_np(small, 255)), _reference_mask(small, 255))